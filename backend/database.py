@@ -5,14 +5,16 @@ SQLAlchemy + SQLite backend storing candidates, job requisitions,
 and match results.  DB stored in user data dir (AppData on Windows).
 """
 
+import json
 import os
 import sys
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
 from sqlalchemy import (
     Column, Integer, Float, String, Text, Boolean, DateTime,
-    ForeignKey, create_engine,
+    ForeignKey, Index, create_engine, event, func, inspect, select, text,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
@@ -40,10 +42,61 @@ SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _record):
+    # WAL lets API reads proceed while a scrape is writing
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def get_db():
+    """FastAPI dependency: one session per request, closed afterwards."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def vacuum_into(dest):
+    """
+    Write a consistent, compacted snapshot of the live DB to ``dest``.
+
+    VACUUM INTO reads through SQLite's own transaction (WAL included), so it
+    is safe while other sessions write.  ``dest`` must not exist or be empty.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM INTO ?", (str(dest),))
+
+
 def _utcnow():
     return datetime.now(timezone.utc)
 
 
+# ─── Duplicate-detection keys (persisted on Candidate) ───────────────────────
+
+# Deletes every ASCII character except a-z and space
+_NAME_KEY_TABLE = str.maketrans("", "", "".join(
+    chr(i) for i in range(128) if not (chr(i) == " " or "a" <= chr(i) <= "z")
+))
+
+
+def normalize_name(name: str | None) -> str:
+    """Lowercase, strip whitespace and punctuation for duplicate comparison."""
+    # Non-ASCII never survives, so drop it first and let translate() do the rest
+    ascii_name = (name or "").lower().encode("ascii", "ignore").decode("ascii")
+    return ascii_name.translate(_NAME_KEY_TABLE).strip()
+
+
+def email_domain(addr: str | None) -> str:
+    """Extract the domain from an email address."""
+    if not addr or "@" not in addr:
+        return ""
+    return addr.split("@")[1].lower().strip()
+
+
 # ─── Models ──────────────────────────────────────────────────────────────────
 
 class Candidate(Base):
@@ -62,9 +115,68 @@ class Candidate(Base):
     notes = Column(Text, nullable=True)
     tags = Column(Text, nullable=True, default="[]")   # JSON array of strings
     created_at = Column(DateTime, default=_utcnow, nullable=False)
+    # Duplicate-detection keys — see normalize_name() / email_domain()
+    name_normalized = Column(String(255), nullable=True, index=True)
+    email_domain = Column(String(255), nullable=True, index=True)
 
     matches = relationship("MatchResult", back_populates="candidate")
 
+    # Keyset pagination: ORDER BY created_at DESC, id DESC
+    __table_args__ = (
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+    )
+
+    def _json_list(self, column: str) -> list:
+        """
+        Parsed JSON array for ``column``, memoized per instance.
+
+        The cache is keyed on the raw column text so assigning a new value
+        (e.g. from the update endpoint) is picked up on the next read.
+        Returns a fresh list each time; callers may mutate it.
+        """
+        raw = getattr(self, column)
+        cache = self.__dict__.setdefault("_json_cache", {})
+        hit = cache.get(column)
+        if hit is None or hit[0] is not raw:
+            hit = (raw, json.loads(raw) if raw else [])
+            cache[column] = hit
+        return list(hit[1])
+
+    @property
+    def skills_list(self) -> list:
+        return self._json_list("skills")
+
+    @property
+    def titles_list(self) -> list:
+        return self._json_list("titles")
+
+    @property
+    def tags_list(self) -> list:
+        return self._json_list("tags")
+
+
+# Dedup looks candidates up by case-insensitive email; indexing the same
+# lower(email) expression the queries use lets SQLite seek instead of scan.
+Index("ix_candidates_email_lower", func.lower(Candidate.email))
+
+
+class CandidateSkill(Base):
+    """One row per (candidate, lower-cased skill) — lets matching intersect in SQL."""
+    __tablename__ = "candidate_skills"
+
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    skill = Column(String(255), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_candidate_skills_skill_candidate", "skill", "candidate_id"),
+    )
+
+
+def candidate_skill_rows(candidate_id: int, skills: list | None) -> list[dict]:
+    """Junction rows for ``candidate_id`` — lower-cased, de-duplicated, blanks dropped."""
+    keys = {s.lower() for s in (skills or []) if isinstance(s, str) and s.strip()}
+    return [{"candidate_id": candidate_id, "skill": k} for k in keys]
+
 
 class JobRequisition(Base):
     __tablename__ = "job_requisitions"
@@ -81,6 +193,73 @@ class JobRequisition(Base):
     matches = relationship("MatchResult", back_populates="job")
 
 
+# ─── Job skill cache ────────────────────────────────────────────────────────
+# Every job's required skills as a bitmask over one shared vocabulary, so the
+# high-fit check for a saved candidate is an AND + popcount per job rather
+# than a set intersection.  Read on every saved candidate; jobs change rarely,
+# so build it once and drop it whenever a JobRequisition write is committed.
+
+JobSkillIndex = tuple[dict[str, int], list[tuple[int, str, int, int]]]
+
+_job_skill_cache: JobSkillIndex | None = None
+_job_skill_generation = 0
+_job_skill_lock = threading.Lock()
+
+
+def job_skill_index(db) -> JobSkillIndex:
+    """
+    ``(skill_bits, jobs)`` — ``skill_bits`` maps each lower-cased job skill to
+    its bit; ``jobs`` holds ``(job_id, title, skills_mask, skill_count)`` for
+    every job that lists at least one skill.
+    """
+    global _job_skill_cache
+    with _job_skill_lock:
+        cached, generation = _job_skill_cache, _job_skill_generation
+    if cached is not None:
+        return cached
+    rows = db.execute(select(
+        JobRequisition.id, JobRequisition.title, JobRequisition.required_skills,
+    )).all()
+    skill_bits: dict[str, int] = {}
+    jobs = []
+    for job_id, title, raw in rows:
+        mask = 0
+        for s in (json.loads(raw) if raw else []):
+            mask |= skill_bits.setdefault(s.lower(), 1 << len(skill_bits))
+        if mask:
+            jobs.append((job_id, title, mask, mask.bit_count()))
+    cached = (skill_bits, jobs)
+    with _job_skill_lock:
+        # Don't publish a snapshot that a concurrent commit already invalidated
+        if generation == _job_skill_generation:
+            _job_skill_cache = cached
+    return cached
+
+
+def invalidate_job_skill_cache() -> None:
+    """Call after bulk/Core writes to job_requisitions (ORM writes are tracked)."""
+    global _job_skill_cache, _job_skill_generation
+    with _job_skill_lock:
+        _job_skill_cache = None
+        _job_skill_generation += 1
+
+
+def _mark_jobs_dirty(_mapper, _connection, target):
+    session = inspect(target).session
+    if session is not None:
+        session.info["jobs_dirty"] = True
+
+
+for _evt in ("after_insert", "after_update", "after_delete"):
+    event.listen(JobRequisition, _evt, _mark_jobs_dirty)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_jobs_on_commit(session):
+    if session.info.pop("jobs_dirty", False):
+        invalidate_job_skill_cache()
+
+
 class MatchResult(Base):
     __tablename__ = "match_results"
 
@@ -112,6 +291,13 @@ class ScrapedEmail(Base):
     is_read = Column(Boolean, default=False)
     scraped_at = Column(DateTime, default=_utcnow, nullable=False)
 
+    # Support the cached inbox listing: filter by folder, order by date desc
+    __table_args__ = (
+        Index("ix_scraped_emails_folder_date", "folder", "date"),
+        Index("ix_scraped_emails_date", "date"),
+        Index("ix_scraped_emails_is_read", "is_read"),
+    )
+
 
 class Attachment(Base):
     __tablename__ = "attachments"
@@ -154,13 +340,42 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=_utcnow, nullable=False)
 
+    # Partial index: only unread rows, so unread lookups/updates are O(#unread)
+    __table_args__ = (
+        Index("ix_notifications_unread", "created_at", sqlite_where=text("is_read = 0")),
+    )
+
+
+class EntityCache(Base):
+    __tablename__ = "entity_cache"
+
+    text_hash = Column(String(32), primary_key=True)   # parsers.entity_cache_key()
+    entities_json = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=_utcnow, nullable=False)
+
 
 # ─── Table creation ──────────────────────────────────────────────────────────
 
+_tables_ready = False
+_tables_lock = threading.RLock()
+
+
 def create_tables():
     """Create all tables in the SQLite database if they don't already exist."""
-    Base.metadata.create_all(bind=engine)
-    _migrate_tables()
+    global _tables_ready
+    with _tables_lock:
+        Base.metadata.create_all(bind=engine)
+        _migrate_tables()
+        _tables_ready = True
+
+
+def ensure_tables():
+    """:func:`create_tables`, but only if this process hasn't run it yet."""
+    if _tables_ready:
+        return
+    with _tables_lock:
+        if not _tables_ready:
+            create_tables()
 
 
 def _migrate_tables():
@@ -175,6 +390,65 @@ def _migrate_tables():
         cursor.execute("ALTER TABLE candidates ADD COLUMN notes TEXT")
     if "tags" not in existing:
         cursor.execute("ALTER TABLE candidates ADD COLUMN tags TEXT DEFAULT '[]'")
+    if "name_normalized" not in existing or "email_domain" not in existing:
+        if "name_normalized" not in existing:
+            cursor.execute("ALTER TABLE candidates ADD COLUMN name_normalized VARCHAR(255)")
+        if "email_domain" not in existing:
+            cursor.execute("ALTER TABLE candidates ADD COLUMN email_domain VARCHAR(255)")
+        # Backfill existing rows with the same Python normalization
+        conn.create_function("py_normalize_name", 1, normalize_name, deterministic=True)
+        conn.create_function("py_email_domain", 1, email_domain, deterministic=True)
+        cursor.execute(
+            "UPDATE candidates SET name_normalized = py_normalize_name(name), "
+            "email_domain = py_email_domain(email)"
+        )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidates_name_normalized "
+        "ON candidates (name_normalized)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidates_email_domain ON candidates (email_domain)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidates_created_at_id "
+        "ON candidates (created_at, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidates_email_lower ON candidates (lower(email))"
+    )
+    # Backfill candidate_skills for candidates saved before the junction table
+    cursor.execute(
+        "SELECT id, skills FROM candidates c WHERE c.skills IS NOT NULL AND c.skills != '[]' "
+        "AND NOT EXISTS (SELECT 1 FROM candidate_skills s WHERE s.candidate_id = c.id)"
+    )
+    backfill = []
+    for cid, raw in cursor.fetchall():
+        try:
+            backfill.extend(candidate_skill_rows(cid, json.loads(raw)))
+        except (ValueError, TypeError):
+            continue
+    if backfill:
+        cursor.executemany(
+            "INSERT OR IGNORE INTO candidate_skills (candidate_id, skill) "
+            "VALUES (:candidate_id, :skill)",
+            backfill,
+        )
+    # Indexes added after the initial schema (create_all skips existing tables)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_scraped_emails_folder_date "
+        "ON scraped_emails (folder, date)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_scraped_emails_date ON scraped_emails (date)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_scraped_emails_is_read ON scraped_emails (is_read)"
+    )
+    cursor.execute("DROP INDEX IF EXISTS ix_notifications_is_read_created_at")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notifications_unread "
+        "ON notifications (created_at) WHERE is_read = 0"
+    )
     # SchedulerConfig table — ensure it exists (create_all handles this,
     # but we seed a default row if the table is empty)
     cursor.execute("SELECT COUNT(*) FROM scheduler_config")
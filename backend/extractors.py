@@ -4,12 +4,24 @@ Email metadata extraction, profile merging, and candidate deduplication.
 - extract_email_metadata(email_body) – regex extraction from cover-letter / email text
 - merge_profile(resume_data, email_data) – combine resume + email, resume wins ties
 - find_existing_candidate(email_address) – dedupe check against candidates table
+- find_existing_emails(email_addresses) – the same check for a whole batch, one query per chunk
+- cached_extract_entities(raw_text) – extract_entities backed by the entity_cache table
+- lookup_cached_entities / store_cached_entities – the same, split into a read-only
+  lookup and a write on the caller's session
 """
 
+import json
+import logging
 import re
-from typing import Optional
+from typing import Iterable, Optional
 
-from database import SessionLocal, Candidate
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, Candidate, EntityCache
+from parsers import entity_cache_key, extract_entities
+
+logger = logging.getLogger(__name__)
 
 
 # ─── Compiled patterns (module-level for reuse) ─────────────────────────────
@@ -26,6 +38,8 @@ _PHONE_RE = re.compile(
     r'\d{3,4}[\s\-.]?\d{3,4}'            # main number
 )
 
+_NON_DIGIT_RE = re.compile(r'\D')
+
 # "Applying for <role>", "Position: <role>", "Role: <role>", "interested in the <role> position"
 _ROLE_PATTERNS = [
     # "interested in the Senior Engineer position", "applying for the role of Data Scientist"
@@ -48,6 +62,9 @@ _ROLE_PATTERNS = [
     ),
 ]
 
+# Trailing "at Acme" / "with the platform team" after a captured role
+_ROLE_TAIL_RE = re.compile(r'\s+(?:at|with|for)\s+.*$', re.IGNORECASE)
+
 # Name from greeting / sign-off lines
 _NAME_PATTERNS = [
     # "Dear Hiring Manager, my name is John Smith"
@@ -118,7 +135,7 @@ def extract_email_metadata(email_body: str) -> dict:
     if phone_match:
         raw = phone_match.group(0).strip()
         # Only accept if it has enough digits to be a real phone number
-        digits = re.sub(r'\D', '', raw)
+        digits = _NON_DIGIT_RE.sub('', raw)
         if len(digits) >= 7:
             result["phone"] = raw
 
@@ -138,7 +155,7 @@ def extract_email_metadata(email_body: str) -> dict:
         if m:
             role = m.group(1).strip()
             # Clean trailing noise
-            role = re.sub(r'\s+(?:at|with|for)\s+.*$', '', role, flags=re.IGNORECASE)
+            role = _ROLE_TAIL_RE.sub('', role)
             if 2 <= len(role) <= 80:
                 result["role_applied"] = role
                 break
@@ -218,20 +235,102 @@ def merge_profile(resume_data: dict, email_data: dict) -> dict:
 
 # ─── Deduplication ──────────────────────────────────────────────────────────
 
-def find_existing_candidate(email_address: str) -> Optional[Candidate]:
+def find_existing_candidate(email_address: str) -> Optional[int]:
     """
     Look up a candidate by email address (case-insensitive).
 
-    Returns the existing ``Candidate`` row or ``None``.
+    Returns the existing candidate's id or ``None``.
     """
     if not email_address:
         return None
     db = SessionLocal()
     try:
-        return (
-            db.query(Candidate)
-            .filter(Candidate.email.ilike(email_address.strip()))
-            .first()
-        )
+        # Same lower(email) expression as ix_candidates_email_lower
+        return db.execute(
+            select(Candidate.id)
+            .where(func.lower(Candidate.email) == func.lower(email_address.strip()))
+            .limit(1)
+        ).scalar()
+    finally:
+        db.close()
+
+
+# Stay well under SQLite's bound-parameter limit (999 on older builds)
+_EMAIL_LOOKUP_CHUNK = 500
+
+
+def find_existing_emails(email_addresses) -> dict[str, int]:
+    """
+    Batch form of :func:`find_existing_candidate`.
+
+    Returns ``{lower-cased email: candidate id}`` for every address that
+    already has a candidate row.
+    """
+    wanted = sorted({e.strip().lower() for e in email_addresses if e and e.strip()})
+    if not wanted:
+        return {}
+    found: dict[str, int] = {}
+    db = SessionLocal()
+    try:
+        for i in range(0, len(wanted), _EMAIL_LOOKUP_CHUNK):
+            chunk = wanted[i:i + _EMAIL_LOOKUP_CHUNK]
+            rows = db.execute(
+                select(func.lower(Candidate.email), Candidate.id)
+                .where(func.lower(Candidate.email).in_(chunk))
+            )
+            for email, cid in rows:
+                found.setdefault(email, cid)
+        return found
     finally:
         db.close()
+
+
+def lookup_cached_entities(raw_text: str) -> tuple[dict, tuple[str, str] | None]:
+    """
+    ``extract_entities`` backed by the entity_cache table, read-only.
+
+    Returns the entities plus, on a cache miss, the ``(text_hash,
+    entities_json)`` row for :func:`store_cached_entities` — so worker
+    processes can use the cache while the caller does the writing.
+    """
+    if not raw_text:
+        return extract_entities(raw_text), None
+    key = entity_cache_key(raw_text)
+    db = SessionLocal()
+    try:
+        row = db.get(EntityCache, key)
+        if row is not None:
+            try:
+                return json.loads(row.entities_json), None
+            except ValueError:
+                pass
+    finally:
+        db.close()
+    entities = extract_entities(raw_text)
+    return entities, (key, json.dumps(entities))
+
+
+def store_cached_entities(db: Session, rows: Iterable[tuple[str, str]]) -> None:
+    """Add entity_cache rows from :func:`lookup_cached_entities` to ``db`` (not committed)."""
+    for key, entities_json in dict(rows).items():
+        db.merge(EntityCache(text_hash=key, entities_json=entities_json))
+
+
+def cached_extract_entities(raw_text: str) -> dict:
+    """
+    ``extract_entities`` with results persisted in SQLite, keyed by
+    :func:`parsers.entity_cache_key`, so re-parsing the same document under
+    the same rules is a lookup.
+    """
+    entities, cache_row = lookup_cached_entities(raw_text)
+    if cache_row is not None:
+        db = SessionLocal()
+        try:
+            store_cached_entities(db, [cache_row])
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to cache extracted entities")
+        finally:
+            db.close()
+    return entities
@@ -4,39 +4,85 @@ Handles OAuth2 token management, folder listing, message retrieval, and attachme
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
 import os
-import base64
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import pybase64 as _b64  # SIMD-accelerated decoder
+except ImportError:
+    import base64 as _b64
+
 SESSION_FILE = Path(__file__).resolve().parent / ".session.json"
 
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 TOKEN_URL = "https://login.microsoftonline.com/common/oauth2/v2.0/token"
 
+# Shared HTTP session — keeps TLS connections to login.microsoftonline.com and
+# graph.microsoft.com warm across token refreshes and Graph calls.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# JSON batching: Graph accepts at most 20 sub-requests per $batch call
+BATCH_LIMIT = 20
+BATCH_WORKERS = 4
+
+# Retries for throttled (429/503) Graph calls
+MAX_RETRIES = 3
+
+# One token refresh at a time; concurrent callers wait and reuse its result
+_refresh_lock = threading.Lock()
+
 
 def get_tokens() -> dict | None:
     """Read .session.json and return the microsoft_tokens dict if it exists."""
     if not SESSION_FILE.exists():
         return None
     try:
-        data = json.loads(SESSION_FILE.read_text())
+        data = orjson.loads(SESSION_FILE.read_bytes())
         return data.get("microsoft_tokens")
-    except (json.JSONDecodeError, OSError):
+    except (orjson.JSONDecodeError, OSError):
         return None
 
 
 def save_tokens(tokens: dict):
-    """Read existing .session.json, add/update microsoft_tokens key, save back."""
+    """Read existing .session.json, add/update microsoft_tokens key, save back atomically."""
     data = {}
     if SESSION_FILE.exists():
         try:
-            data = json.loads(SESSION_FILE.read_text())
-        except (json.JSONDecodeError, OSError):
+            data = orjson.loads(SESSION_FILE.read_bytes())
+        except (orjson.JSONDecodeError, OSError):
             data = {}
     data["microsoft_tokens"] = tokens
-    SESSION_FILE.write_text(json.dumps(data))
+    # A temp file of its own per writer, so concurrent saves never share one
+    with tempfile.NamedTemporaryFile(
+        dir=SESSION_FILE.parent, prefix=".session.", suffix=".tmp", delete=False,
+    ) as tmp:
+        tmp.write(orjson.dumps(data))
+    try:
+        os.replace(tmp.name, SESSION_FILE)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
+
+
+def _unexpired_access_token(tokens: dict) -> str | None:
+    access_token = tokens.get("access_token")
+    expires_at_str = tokens.get("access_token_expires_at")
+    if access_token and expires_at_str:
+        try:
+            expires_at = datetime.fromisoformat(expires_at_str)
+            if datetime.utcnow() < expires_at - timedelta(minutes=2):
+                return access_token
+        except (ValueError, TypeError):
+            pass
+    return None
 
 
 def refresh_access_token() -> str | None:
@@ -47,20 +93,20 @@ def refresh_access_token() -> str | None:
     tokens = get_tokens()
     if not tokens:
         return None
+    access_token = _unexpired_access_token(tokens)
+    if access_token:
+        return access_token
 
-    access_token = tokens.get("access_token")
-    expires_at_str = tokens.get("access_token_expires_at")
+    with _refresh_lock:
+        # Another thread may have refreshed while this one waited
+        tokens = get_tokens()
+        if not tokens:
+            return None
+        return _unexpired_access_token(tokens) or _refresh_tokens(tokens)
 
-    # Check if token is still valid
-    if access_token and expires_at_str:
-        try:
-            expires_at = datetime.fromisoformat(expires_at_str)
-            if datetime.utcnow() < expires_at - timedelta(minutes=2):
-                return access_token
-        except (ValueError, TypeError):
-            pass
 
-    # Token expired or missing — refresh it
+def _refresh_tokens(tokens: dict) -> str | None:
+    """Trade the refresh_token for a new access token and save both."""
     refresh_token = tokens.get("refresh_token")
     if not refresh_token:
         return None
@@ -70,7 +116,7 @@ def refresh_access_token() -> str | None:
         return None
 
     try:
-        resp = requests.post(TOKEN_URL, data={
+        resp = HTTP_SESSION.post(TOKEN_URL, data={
             "client_id": client_id,
             "grant_type": "refresh_token",
             "refresh_token": refresh_token,
@@ -87,18 +133,29 @@ def refresh_access_token() -> str | None:
         tokens["access_token"] = new_access_token
         tokens["refresh_token"] = new_refresh_token
         tokens["access_token_expires_at"] = new_expires_at
-        save_tokens(tokens)
-
-        return new_access_token
     except Exception:
         return None
 
+    try:
+        save_tokens(tokens)
+    except OSError:
+        pass  # the new token is still good for this call
+    return new_access_token
+
 
 def get_valid_token() -> str | None:
     """Return a valid access token, refreshing if necessary."""
     return refresh_access_token()
 
 
+def _retry_after(value, attempt: int) -> float:
+    """Seconds to wait before retrying a throttled call (Retry-After or backoff)."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return float(2 ** attempt)
+
+
 def graph_get(endpoint: str) -> dict:
     """
     GET request to Microsoft Graph API.
@@ -109,10 +166,39 @@ def graph_get(endpoint: str) -> dict:
         raise Exception("No valid Microsoft Graph access token")
 
     url = f"{GRAPH_BASE}/{endpoint}"
-    resp = requests.get(url, headers={
+    for attempt in range(MAX_RETRIES + 1):
+        resp = HTTP_SESSION.get(url, headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }, timeout=30)
+        # Throttled — wait as instructed (or back off) and retry
+        if resp.status_code not in (429, 503) or attempt == MAX_RETRIES:
+            break
+        time.sleep(_retry_after(resp.headers.get("Retry-After"), attempt))
+
+    if resp.status_code == 401:
+        raise Exception("Microsoft Graph token expired or invalid (401)")
+    if resp.status_code >= 400:
+        detail = resp.text[:500]
+        raise Exception(f"Microsoft Graph API error {resp.status_code}: {detail}")
+
+    return resp.json()
+
+
+def graph_post(endpoint: str, payload: dict) -> dict:
+    """
+    POST a JSON payload to Microsoft Graph API.
+    Raises exception on 401 or other errors.
+    """
+    token = get_valid_token()
+    if not token:
+        raise Exception("No valid Microsoft Graph access token")
+
+    url = f"{GRAPH_BASE}/{endpoint}"
+    resp = HTTP_SESSION.post(url, data=orjson.dumps(payload), headers={
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
-    }, timeout=30)
+    }, timeout=60)
 
     if resp.status_code == 401:
         raise Exception("Microsoft Graph token expired or invalid (401)")
@@ -249,8 +335,71 @@ def get_message(message_id: str) -> dict:
     }
 
 
+def decode_content_bytes(content_b64: str | bytes) -> bytes:
+    """Decode a Graph ``contentBytes`` base64 payload."""
+    return _b64.b64decode(content_b64, validate=False)
+
+
 def download_attachment(message_id: str, attachment_id: str) -> bytes:
     """Download a specific attachment, returning the raw bytes."""
     data = graph_get(f"me/messages/{message_id}/attachments/{attachment_id}")
     content_b64 = data.get("contentBytes", "")
-    return base64.b64decode(content_b64)
+    return decode_content_bytes(content_b64)
+
+
+def _download_attachment_batch(pairs: list) -> dict:
+    """Fetch up to BATCH_LIMIT attachments in one $batch call, retrying throttled ones."""
+    results = {}
+    pending = {str(i): pair for i, pair in enumerate(pairs)}
+    for attempt in range(MAX_RETRIES + 1):
+        data = graph_post("$batch", {"requests": [
+            {"id": req_id, "method": "GET",
+             "url": f"/me/messages/{msg_id}/attachments/{att_id}"}
+            for req_id, (msg_id, att_id) in pending.items()
+        ]})
+        throttled = {}
+        retry_after = 0.0
+        for sub in data.get("responses", []):
+            pair = pending.get(sub.get("id"))
+            if pair is None:
+                continue
+            status = sub.get("status", 0)
+            if status == 429 or status >= 500:
+                throttled[sub["id"]] = pair
+                headers = {k.lower(): v for k, v in (sub.get("headers") or {}).items()}
+                retry_after = max(retry_after, _retry_after(headers.get("retry-after"), attempt))
+            elif status == 200:
+                content_b64 = (sub.get("body") or {}).get("contentBytes")
+                if content_b64:
+                    results[pair] = decode_content_bytes(content_b64)
+        if not throttled or attempt == MAX_RETRIES:
+            break
+        pending = throttled
+        time.sleep(retry_after)
+    return results
+
+
+def download_attachments(pairs: list) -> dict:
+    """
+    Download many attachments via JSON batching.
+
+    ``pairs`` is a list of ``(message_id, attachment_id)`` tuples; returns a
+    dict mapping each successfully downloaded pair to its raw bytes.
+    Batches are sent concurrently; a failed batch only drops its own entries.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    chunks = [pairs[i:i + BATCH_LIMIT] for i in range(0, len(pairs), BATCH_LIMIT)]
+    results = {}
+    if not chunks:
+        return results
+
+    def _safe_batch(chunk: list) -> dict:
+        try:
+            return _download_attachment_batch(chunk)
+        except Exception:
+            return {}
+
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(chunks))) as pool:
+        for part in pool.map(_safe_batch, chunks):
+            results.update(part)
+    return results
@@ -3,6 +3,11 @@ if sys.version_info >= (3, 12):
     print("FATAL: Python 3.12+ not supported. Use Python 3.11.")
     sys.exit(1)
 
+# Frozen (PyInstaller) builds: pipeline worker processes re-launch this
+# executable — hand them off before any app setup runs.
+import multiprocessing
+multiprocessing.freeze_support()
+
 """
 Outlook Mail Scraper - FastAPI Backend (IMAP)
 Connects to Outlook via IMAP to fetch emails, attachments, and metadata.
@@ -11,9 +16,12 @@ Connects to Outlook via IMAP to fetch emails, attachments, and metadata.
 import os
 import io
 import csv
+import functools
+import hashlib
 import json
 import re
 import base64
+import binascii
 import logging
 import mimetypes
 import zipfile
@@ -23,10 +31,19 @@ import email.header
 import email.utils
 import email.policy
 import asyncio
+import quopri
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List
+from typing import Optional, List, Iterable, Iterator, BinaryIO
 from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
 from database import USER_DATA_DIR
 
@@ -38,35 +55,35 @@ TEMPLATE_FILE = Path(__file__).resolve().parent / ".env.template"
 if not ENV_FILE.exists():
     if _BACKEND_ENV.exists():
         # Copy dev .env into user data dir
-        import shutil
         shutil.copy(_BACKEND_ENV, ENV_FILE)
         print(f"INFO: Copied .env to {ENV_FILE}")
     elif TEMPLATE_FILE.exists():
-        import shutil
         shutil.copy(TEMPLATE_FILE, ENV_FILE)
         print("INFO: Created .env from template — please edit with your credentials")
 
 load_dotenv(dotenv_path=ENV_FILE)
 
-from fastapi import FastAPI, HTTPException, Request, Response, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, UploadFile, File
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
 
 from database import (
     create_tables as _create_db_tables, DB_PATH, USER_DATA_DIR,
-    SessionLocal, Candidate, JobRequisition, MatchResult, ScrapedEmail, Attachment,
-    SchedulerConfig, Notification,
+    SessionLocal, Candidate, CandidateSkill, JobRequisition, MatchResult, ScrapedEmail,
+    Attachment, SchedulerConfig, Notification, normalize_name, email_domain,
+    get_db, vacuum_into, invalidate_job_skill_cache,
 )
-from parsers import extract_text_from_pdf, extract_text_from_docx, extract_entities
-from pipeline import process_attachment_into_candidate
+from parsers import extract_text_from_pdf, extract_text_from_docx
+from extractors import cached_extract_entities
+from pipeline import process_attachments_into_candidates
 from matcher import run_match, _candidate_to_dict, _job_to_dict
 import graph_client
 import outlook_com
-import requests as http_requests
 
 # ─── Configuration ───────────────────────────────────────────────────────────
 
@@ -86,6 +103,16 @@ DOC_TYPES = {
     "application/vnd.ms-powerpoint", "application/vnd.openxmlformats-officedocument.presentationml.presentation",
     "text/plain", "text/csv",
 }
+# Already-compressed formats — DEFLATE gains almost nothing on these, so they
+# are stored as-is in ZIP downloads.
+_INCOMPRESSIBLE_TYPES = {
+    "image/jpeg", "image/png", "image/gif", "image/webp",
+    "application/pdf", "application/zip", "application/gzip",
+    "application/x-7z-compressed", "application/x-rar-compressed",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
 
 
 def _read_attachment_metadata() -> dict:
@@ -101,62 +128,121 @@ def _write_attachment_metadata(metadata: dict) -> None:
     _METADATA_FILE.write_text(json.dumps(metadata, indent=2, default=str), encoding="utf-8")
 
 
+# Chunk size for streaming attachment bytes to disk
+_COPY_CHUNK = 1 << 20
+
+# Concurrent attachment saves: file writes overlap, metadata updates don't
+_SAVE_WORKERS = 4
+_attachment_meta_lock = threading.Lock()
+
+
 def _save_attachment_with_metadata(
-    content: bytes, uid: int, index: int, original_name: str, content_type: str,
+    content: bytes | BinaryIO | Iterable[bytes], uid: int, index: int,
+    original_name: str, content_type: str,
     email_subject: str = "", email_sender: str = "", email_date: str = "",
-) -> str:
+) -> tuple[str, int]:
+    """Save attachment content (bytes, file-like, or chunk iterator) and record metadata.
+
+    Returns the saved filename and the number of bytes written.
+    """
     safe_name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", original_name)
     filename = f"{uid}_{index}_{safe_name}"
     filepath = ATTACHMENTS_DIR / filename
-    filepath.write_bytes(content)
+    if isinstance(content, (bytes, bytearray)):
+        # Write-then-rename so concurrent saves of the same name never interleave
+        tmp = filepath.with_name(f".{filename}.{threading.get_ident()}.part")
+        tmp.write_bytes(content)
+        os.replace(tmp, filepath)
+        size = len(content)
+    else:
+        with open(filepath, "wb") as fh:
+            if hasattr(content, "read"):
+                shutil.copyfileobj(content, fh, length=_COPY_CHUNK)
+            else:
+                for chunk in content:
+                    fh.write(chunk)
+            size = fh.tell()
 
-    now = datetime.now(timezone.utc)
+    with _attachment_meta_lock:
+        now = datetime.now(timezone.utc)
 
-    # Write to _metadata.json (backward compat)
-    metadata = _read_attachment_metadata()
-    metadata[filename] = {
-        "original_name": original_name,
-        "content_type": content_type,
-        "size": len(content),
-        "email_subject": email_subject,
-        "email_sender": email_sender,
-        "email_date": email_date,
-        "saved_at": now.isoformat(),
-    }
-    _write_attachment_metadata(metadata)
+        # Write to _metadata.json (backward compat)
+        metadata = _read_attachment_metadata()
+        metadata[filename] = {
+            "original_name": original_name,
+            "content_type": content_type,
+            "size": size,
+            "email_subject": email_subject,
+            "email_sender": email_sender,
+            "email_date": email_date,
+            "saved_at": now.isoformat(),
+        }
+        _write_attachment_metadata(metadata)
+
+        # Write to SQLite (primary store)
+        db = SessionLocal()
+        try:
+            existing = db.query(Attachment).filter(Attachment.filename == filename).first()
+            if existing:
+                existing.original_name = original_name
+                existing.content_type = content_type
+                existing.size = size
+                existing.email_uid = str(uid)
+                existing.email_subject = email_subject
+                existing.email_sender = email_sender
+                existing.email_date = email_date
+                existing.saved_at = now
+            else:
+                db.add(Attachment(
+                    filename=filename, original_name=original_name,
+                    content_type=content_type, size=size,
+                    email_uid=str(uid), email_subject=email_subject,
+                    email_sender=email_sender, email_date=email_date,
+                    saved_at=now,
+                ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to persist attachment metadata to SQLite")
+        finally:
+            db.close()
+
+    return filename, size
+
+
+def _message_file_key(message_id: str) -> str:
+    """Short filename-safe key for a Graph / Outlook message ID.
+
+    Those IDs share a long store prefix, so a truncated ID is not unique.
+    """
+    return hashlib.blake2b(message_id.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _save_attachments(jobs: list[dict]) -> list[tuple[str, int]]:
+    """Save several attachments at once; returns (filename, size) in job order."""
+    if len(jobs) < 2:
+        return [_save_attachment_with_metadata(**job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(_SAVE_WORKERS, len(jobs))) as pool:
+        return list(pool.map(lambda job: _save_attachment_with_metadata(**job), jobs))
+
+
+def _zip_compress_type(content_type: str) -> int:
+    """Pick ZIP_STORED for already-compressed content, ZIP_DEFLATED otherwise."""
+    ct = (content_type or "").split(";", 1)[0].strip().lower()
+    if ct in _INCOMPRESSIBLE_TYPES or ct.startswith(("video/", "audio/")):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
 
-    # Write to SQLite (primary store)
-    db = SessionLocal()
-    try:
-        existing = db.query(Attachment).filter(Attachment.filename == filename).first()
-        if existing:
-            existing.original_name = original_name
-            existing.content_type = content_type
-            existing.size = len(content)
-            existing.email_uid = str(uid)
-            existing.email_subject = email_subject
-            existing.email_sender = email_sender
-            existing.email_date = email_date
-            existing.saved_at = now
-        else:
-            db.add(Attachment(
-                filename=filename, original_name=original_name,
-                content_type=content_type, size=len(content),
-                email_uid=str(uid), email_subject=email_subject,
-                email_sender=email_sender, email_date=email_date,
-                saved_at=now,
-            ))
-        db.commit()
-    except Exception:
-        db.rollback()
-        logger.exception("Failed to persist attachment metadata to SQLite")
-    finally:
-        db.close()
 
-    return filename
+@functools.lru_cache(maxsize=1024)
+def _guess_type(filename: str) -> str:
+    """Cached ``mimetypes.guess_type`` with an octet-stream fallback."""
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
 
+@functools.lru_cache(maxsize=256)
 def _classify_file_type(content_type: str) -> str:
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
     if content_type in IMAGE_TYPES:
         return "image"
     if content_type in PDF_TYPES:
@@ -179,18 +265,35 @@ _imap_connection: imaplib.IMAP4_SSL | None = None
 _imap_lock = asyncio.Lock()
 
 
+def _read_session_file() -> dict:
+    """Return the parsed .session.json contents, or {} if missing/unreadable."""
+    try:
+        return orjson.loads(SESSION_FILE.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
+        return {}
+
+
+def _write_session_file(data: dict) -> None:
+    """Write .session.json atomically so a crash can't leave it truncated."""
+    # A temp file of its own per writer, so concurrent saves never share one
+    with tempfile.NamedTemporaryFile(
+        dir=SESSION_FILE.parent, prefix=".session.", suffix=".tmp", delete=False,
+    ) as tmp:
+        tmp.write(orjson.dumps(data))
+    try:
+        os.replace(tmp.name, SESSION_FILE)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
+
+
 def _save_session():
     """Persist current IMAP credentials to .session.json, preserving other keys."""
     try:
-        data = {}
-        if SESSION_FILE.exists():
-            try:
-                data = json.loads(SESSION_FILE.read_text())
-            except (json.JSONDecodeError, OSError):
-                data = {}
+        data = _read_session_file()
         data["email"] = _credentials.get("email", "")
         data["password"] = _credentials.get("password", "")
-        SESSION_FILE.write_text(json.dumps(data))
+        _write_session_file(data)
     except Exception:
         logger.exception("Failed to save session file")
 
@@ -209,7 +312,7 @@ def _restore_session():
     if not SESSION_FILE.exists():
         return
     try:
-        data = json.loads(SESSION_FILE.read_text())
+        data = orjson.loads(SESSION_FILE.read_bytes())
 
         # Check for OAuth2 session first
         if data.get("microsoft_tokens"):
@@ -246,15 +349,11 @@ def get_auth_method() -> str:
         return method
     # Check .session.json for persisted auth_method
     if SESSION_FILE.exists():
-        try:
-            data = json.loads(SESSION_FILE.read_text())
-            saved_method = data.get("auth_method", "")
-            if saved_method == "outlook_com":
-                _credentials["auth_method"] = "outlook_com"
-                _credentials["email"] = data.get("email", "")
-                return "outlook_com"
-        except (json.JSONDecodeError, OSError):
-            pass
+        data = _read_session_file()
+        if data.get("auth_method", "") == "outlook_com":
+            _credentials["auth_method"] = "outlook_com"
+            _credentials["email"] = data.get("email", "")
+            return "outlook_com"
     # Infer from credentials state
     if _credentials.get("password"):
         return "imap"
@@ -419,8 +518,8 @@ def _get_attachments(msg: email.message.Message) -> list[dict]:
     return attachments
 
 
-def _get_attachment_by_index(msg: email.message.Message, target_idx: int):
-    """Get attachment content by index. Returns (filename, content_type, bytes)."""
+def _find_attachment_part(msg: email.message.Message, target_idx: int):
+    """Locate an attachment part by index. Returns (filename, content_type, part)."""
     idx = 0
     for part in msg.walk():
         disp = str(part.get("Content-Disposition", ""))
@@ -433,16 +532,137 @@ def _get_attachment_by_index(msg: email.message.Message, target_idx: int):
         if not is_attachment:
             continue
         if idx == target_idx:
-            payload = part.get_payload(decode=True) or b""
             return (
                 filename or f"attachment_{idx}",
                 part.get_content_type() or "application/octet-stream",
-                payload,
+                part,
             )
         idx += 1
     return None
 
 
+def _walk_once(
+    msg: email.message.Message, attachment_sizes: bool = True,
+) -> tuple[str, str, list[dict]]:
+    """Single pass over the MIME tree returning (text_body, html_body, attachments).
+
+    Equivalent to ``_get_body`` + ``_get_attachments`` but walks the parts and
+    decodes each payload only once.  With ``attachment_sizes=False`` attachment
+    parts that can't be the body are not decoded at all and report size 0 —
+    for callers that stream them to disk and measure them there.
+    """
+    text_body = ""
+    html_body = ""
+    attachments = []
+    multipart = msg.is_multipart()
+    idx = 0
+    for part in msg.walk():
+        disp = str(part.get("Content-Disposition", ""))
+        filename = part.get_filename()
+        if filename:
+            filename = decode_mime_header(filename)
+        is_attachment = "attachment" in disp or (
+            filename and part.get_content_maintype() not in ("multipart",)
+        )
+        ctype = part.get_content_type()
+        maybe_body = not multipart or ("attachment" not in disp and (
+            (ctype == "text/plain" and not text_body)
+            or (ctype == "text/html" and not html_body)
+        ))
+        payload = None
+        if not part.is_multipart() and (maybe_body or (is_attachment and attachment_sizes)):
+            payload = part.get_payload(decode=True)
+
+        # Body: same rules as _get_body
+        if payload and (not multipart or "attachment" not in disp):
+            charset = part.get_content_charset() or "utf-8"
+            if not multipart:
+                content = payload.decode(charset, errors="replace")
+                if ctype == "text/html":
+                    html_body = content
+                else:
+                    text_body = content
+            elif ctype == "text/plain" and not text_body:
+                text_body = payload.decode(charset, errors="replace")
+            elif ctype == "text/html" and not html_body:
+                html_body = payload.decode(charset, errors="replace")
+
+        # Attachments: same rules as _get_attachments
+        if is_attachment:
+            attachments.append({
+                "index": idx,
+                "name": filename or f"attachment_{idx}",
+                "content_type": part.get_content_type(),
+                "size": len(payload) if payload else 0,
+                "is_inline": "inline" in disp,
+            })
+            idx += 1
+    return text_body, html_body, attachments
+
+
+def _get_attachment_by_index(msg: email.message.Message, target_idx: int):
+    """Get attachment content by index. Returns (filename, content_type, bytes)."""
+    found = _find_attachment_part(msg, target_idx)
+    if not found:
+        return None
+    filename, content_type, part = found
+    return filename, content_type, part.get_payload(decode=True) or b""
+
+
+# Anything outside the base64 alphabet (line breaks, stray junk) — dropped
+# before decoding, as the email package's lenient decoder does
+_B64_JUNK_RE = re.compile(r"[^A-Za-z0-9+/=]+")
+
+
+def _iter_part_payload(part: email.message.Message, chunk_size: int = _COPY_CHUNK):
+    """Yield the decoded payload of a MIME part in chunks.
+
+    Base64 bodies are decoded incrementally so the full decoded attachment is
+    never held in memory; other transfer encodings fall back to a single chunk.
+    """
+    cte = str(part.get("Content-Transfer-Encoding", "")).strip().lower()
+    raw = part.get_payload(decode=False)
+    if cte != "base64" or not isinstance(raw, str):
+        yield part.get_payload(decode=True) or b""
+        return
+    # Junk is stripped per chunk and only whole 4-character groups reach the
+    # decoder, so nothing can fail once bytes are on their way to disk.  "="
+    # follows binascii's lenient rules: ignored mid-group, end of data once
+    # it completes a group.
+    carry = ""  # data characters short of a whole group
+    pads = 0    # "=" seen since the last data character
+    done = False
+    for i in range(0, len(raw), chunk_size):
+        piece = _B64_JUNK_RE.sub("", raw[i:i + chunk_size])
+        if "=" in piece:
+            segs = piece.split("=")
+            kept = [segs[0]]
+            if segs[0]:
+                pads = 0
+            group = (len(carry) + len(segs[0])) % 4
+            for seg in segs[1:]:
+                pads += 1
+                if group >= 2 and group + pads >= 4:
+                    done = True
+                    break
+                if seg:
+                    pads = 0
+                    group = (group + len(seg)) % 4
+                kept.append(seg)
+            piece = "".join(kept)
+        elif piece:
+            pads = 0
+        piece = carry + piece
+        usable = len(piece) - len(piece) % 4
+        carry = piece[usable:]
+        if usable:
+            yield binascii.a2b_base64(piece[:usable])
+        if done:
+            break
+    if len(carry) > 1:  # a lone trailing character can't encode a byte
+        yield binascii.a2b_base64(carry + "=" * (-len(carry) % 4))
+
+
 def _has_attachments(msg: email.message.Message) -> bool:
     """Check if message has attachments by examining Content-Disposition headers."""
     for part in msg.walk():
@@ -518,6 +738,8 @@ def _decode_imap_utf7(data: bytes) -> str:
 
 
 _FOLDER_RE = re.compile(rb'\(([^)]*)\)\s+"([^"]*)"\s+(.+)')
+# STATUS response items, e.g. b'"INBOX" (MESSAGES 42 UNSEEN 3)' — order-independent
+_STATUS_ITEM_RE = re.compile(rb'(MESSAGES|UNSEEN)\s+(\d+)')
 
 
 def _parse_folder_line(line: bytes) -> dict | None:
@@ -561,10 +783,214 @@ def _parse_fetch_response(data: list) -> list[tuple[int, set, bytes]]:
     return results
 
 
+# ─── IMAP BODYSTRUCTURE parsing ─────────────────────────────────────────────
+
+_LPAREN = object()
+_RPAREN = object()
+_LITERAL = object()
+_IMAP_TOKEN_RE = re.compile(rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|\{(\d+)\}|([^\s()"{]+))')
+
+
+class _UnsupportedStructure(Exception):
+    """BODYSTRUCTURE shape we don't map — caller falls back to a full fetch."""
+
+
+def _tokenize_imap(data: bytes) -> list:
+    tokens = []
+    pos = 0
+    while pos < len(data):
+        m = _IMAP_TOKEN_RE.match(data, pos)
+        if not m or m.end() == pos:
+            break
+        pos = m.end()
+        lparen, rparen, quoted, literal, atom = m.groups()
+        if lparen:
+            tokens.append(_LPAREN)
+        elif rparen:
+            tokens.append(_RPAREN)
+        elif quoted is not None:
+            tokens.append(re.sub(rb'\\(.)', rb'\1', quoted))
+        elif literal is not None:
+            tokens.append(_LITERAL)
+        elif atom is not None:
+            tokens.append(None if atom.upper() == b"NIL" else atom)
+    return tokens
+
+
+def _parse_imap_response(data: list) -> list:
+    """Parse an imaplib response (bytes / (header, literal) tuples) into nested lists."""
+    tokens = []
+    for item in data:
+        if isinstance(item, tuple):
+            tokens.extend(_tokenize_imap(item[0]))
+            if tokens and tokens[-1] is _LITERAL:
+                tokens[-1] = item[1]
+        elif isinstance(item, bytes):
+            tokens.extend(_tokenize_imap(item))
+    stack: list[list] = [[]]
+    for tok in tokens:
+        if tok is _LPAREN:
+            stack.append([])
+        elif tok is _RPAREN:
+            if len(stack) > 1:
+                done = stack.pop()
+                stack[-1].append(done)
+        else:
+            stack[-1].append(tok)
+    return stack[0]
+
+
+def _find_imap_item(node, key: bytes):
+    """Return the value following *key* anywhere in a parsed FETCH response."""
+    if isinstance(node, list):
+        for i, val in enumerate(node):
+            if isinstance(val, bytes) and val.upper() == key and i + 1 < len(node):
+                return node[i + 1]
+            found = _find_imap_item(val, key)
+            if found is not None:
+                return found
+    return None
+
+
+def _imap_str(val) -> str:
+    return val.decode("utf-8", errors="replace") if isinstance(val, bytes) else ""
+
+
+def _imap_params(val) -> dict[str, str]:
+    if not isinstance(val, list):
+        return {}
+    params = {}
+    for i in range(0, len(val) - 1, 2):
+        key = _imap_str(val[i]).lower()
+        if "*" in key:
+            raise _UnsupportedStructure("RFC 2231 parameter")
+        params[key] = _imap_str(val[i + 1])
+    return params
+
+
+def _bodystructure_attachments(body: list, section: str = "") -> list[dict]:
+    """List attachments from a parsed BODYSTRUCTURE in ``_get_attachments`` order.
+
+    Each entry carries the IMAP section path, transfer encoding, filename and
+    content type. Raises _UnsupportedStructure for shapes where the order could
+    diverge from the email package's walk (e.g. embedded message/rfc822).
+    """
+    if not isinstance(body, list) or not body:
+        raise _UnsupportedStructure("empty body")
+
+    if isinstance(body[0], list):  # multipart
+        n_children = 0
+        while n_children < len(body) and isinstance(body[n_children], list):
+            n_children += 1
+        ext = body[n_children + 1:]
+        disposition = ext[1] if len(ext) > 1 else None
+        if isinstance(disposition, list) and b"ATTACHMENT" in (disposition[0] or b"").upper():
+            raise _UnsupportedStructure("multipart with attachment disposition")
+        found = []
+        for i in range(n_children):
+            child_section = f"{section}.{i + 1}" if section else str(i + 1)
+            found.extend(_bodystructure_attachments(body[i], child_section))
+        return found
+
+    if len(body) < 7:
+        raise _UnsupportedStructure("short body part")
+    maintype = _imap_str(body[0]).lower()
+    subtype = _imap_str(body[1]).lower()
+    if maintype == "message" and subtype == "rfc822":
+        raise _UnsupportedStructure("embedded message")
+    ctype_params = _imap_params(body[2])
+    encoding = _imap_str(body[5]).lower()
+    disp_idx = 9 if maintype == "text" else 8
+    disposition = body[disp_idx] if len(body) > disp_idx else None
+
+    disp_str = ""
+    disp_params: dict[str, str] = {}
+    if isinstance(disposition, list) and disposition:
+        disp_params = _imap_params(disposition[1] if len(disposition) > 1 else None)
+        disp_str = "; ".join(
+            [_imap_str(disposition[0]).lower()] + [f'{k}="{v}"' for k, v in disp_params.items()]
+        )
+    filename = disp_params.get("filename") or ctype_params.get("name")
+    if filename:
+        filename = decode_mime_header(filename)
+
+    if "attachment" in disp_str or filename:
+        return [{
+            "section": section or "1",
+            "encoding": encoding,
+            "name": filename,
+            "content_type": f"{maintype}/{subtype}",
+        }]
+    return []
+
+
+def _decode_transfer_encoding(raw: bytes, encoding: str) -> bytes:
+    if encoding == "base64":
+        return base64.b64decode(raw)
+    if encoding == "quoted-printable":
+        return quopri.decodestring(raw)
+    return raw
+
+
 # ─── Scheduler ────────────────────────────────────────────────────────────────
 
-scheduler = AsyncIOScheduler()
-_SCHEDULER_JOB_ID = "auto_scrape"
+# A single interval job — one asyncio task that sleeps, scrapes, repeats.
+_scrape_task: Optional[asyncio.Task] = None
+_next_run_at: Optional[float] = None   # time.monotonic() of the next run
+
+# scheduler_status is polled by every open dashboard; serve the config row
+# from memory for this long.  Writers call _invalidate_sched_cfg_cache().
+_SCHED_CFG_TTL = 1.0
+_sched_cfg_cache: Optional[tuple[float, dict]] = None
+
+
+def _invalidate_sched_cfg_cache():
+    global _sched_cfg_cache
+    _sched_cfg_cache = None
+
+
+def _log_scrape_failure(run: asyncio.Task) -> None:
+    if not run.cancelled() and run.exception() is not None:
+        logger.error("Scheduled scrape raised", exc_info=run.exception())
+
+
+async def _scheduler_loop(interval_minutes: int):
+    global _next_run_at
+    try:
+        while True:
+            _next_run_at = time.monotonic() + interval_minutes * 60
+            await asyncio.sleep(interval_minutes * 60)
+            _next_run_at = None
+            run = asyncio.ensure_future(run_scheduled_scrape())
+            try:
+                # Stopping or re-timing the loop only cancels the sleep: a run
+                # cut off mid-IMAP call would leave its worker thread on the
+                # shared connection and skip persisting what it scraped.
+                await asyncio.shield(run)
+            except asyncio.CancelledError:
+                run.add_done_callback(_log_scrape_failure)
+                raise
+            except Exception:
+                logger.exception("Scheduled scrape raised")
+    finally:
+        # A replacement loop may already have set its own next run
+        if _scrape_task is asyncio.current_task():
+            _next_run_at = None
+
+
+def _start_scheduler(interval_minutes: int):
+    """(Re)start the scrape loop with a new interval."""
+    global _scrape_task
+    _stop_scheduler()
+    _scrape_task = asyncio.create_task(_scheduler_loop(interval_minutes))
+
+
+def _stop_scheduler():
+    global _scrape_task, _next_run_at
+    if _scrape_task is not None and not _scrape_task.done():
+        _scrape_task.cancel()
+    _scrape_task = None
+    _next_run_at = None
 
 
 # ─── App Setup ───────────────────────────────────────────────────────────────
@@ -573,6 +999,7 @@ app = FastAPI(
     title="Outlook Mail Scraper",
     description="Scrape and browse Outlook emails via IMAP",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -581,6 +1008,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 
@@ -589,24 +1017,17 @@ _create_db_tables()
 
 
 def _init_scheduler():
-    """Start scheduler and restore job from DB config if enabled."""
+    """Restore the scrape loop from DB config if enabled."""
     db = SessionLocal()
     try:
         cfg = db.query(SchedulerConfig).first()
         if cfg and cfg.enabled and cfg.interval_minutes and cfg.interval_minutes > 0:
-            scheduler.add_job(
-                run_scheduled_scrape,
-                trigger=IntervalTrigger(minutes=cfg.interval_minutes),
-                id=_SCHEDULER_JOB_ID,
-                replace_existing=True,
-            )
+            _start_scheduler(cfg.interval_minutes)
             logger.info("Scheduler restored: every %d min, folder=%s", cfg.interval_minutes, cfg.folder)
     except Exception:
         logger.exception("Failed to restore scheduler from DB")
     finally:
         db.close()
-    scheduler.start()
-    logger.info("APScheduler started")
 
 
 @app.on_event("startup")
@@ -616,8 +1037,7 @@ async def _on_startup():
 
 @app.on_event("shutdown")
 async def _on_shutdown():
-    if scheduler.running:
-        scheduler.shutdown(wait=False)
+    _stop_scheduler()
 
 
 # ─── Migrate _metadata.json → SQLite attachments table (one-time) ────────────
@@ -963,7 +1383,7 @@ async def microsoft_auth_callback(code: str = ""):
 
     # Exchange code for tokens
     try:
-        resp = http_requests.post(token_url, data={
+        resp = graph_client.HTTP_SESSION.post(token_url, data={
             "client_id": client_id,
             "code": code,
             "redirect_uri": redirect_uri,
@@ -983,7 +1403,7 @@ async def microsoft_auth_callback(code: str = ""):
     # Get user profile
     user_email = ""
     try:
-        me_resp = http_requests.get(
+        me_resp = graph_client.HTTP_SESSION.get(
             "https://graph.microsoft.com/v1.0/me",
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=10,
@@ -1004,9 +1424,9 @@ async def microsoft_auth_callback(code: str = ""):
 
     # Update session file with auth_method
     try:
-        data = json.loads(SESSION_FILE.read_text()) if SESSION_FILE.exists() else {}
+        data = _read_session_file()
         data["auth_method"] = "oauth2"
-        SESSION_FILE.write_text(json.dumps(data))
+        _write_session_file(data)
     except Exception:
         pass
 
@@ -1036,11 +1456,11 @@ async def microsoft_logout():
     global _imap_connection
     try:
         if SESSION_FILE.exists():
-            data = json.loads(SESSION_FILE.read_text())
+            data = _read_session_file()
             data.pop("microsoft_tokens", None)
             if data.get("auth_method") == "oauth2":
                 data.pop("auth_method", None)
-            SESSION_FILE.write_text(json.dumps(data))
+            _write_session_file(data)
     except Exception:
         pass
     # Clear in-memory state if it was OAuth2
@@ -1096,16 +1516,11 @@ async def outlook_com_connect():
 
     # Persist to .session.json
     try:
-        data = {}
-        if SESSION_FILE.exists():
-            try:
-                data = json.loads(SESSION_FILE.read_text())
-            except (json.JSONDecodeError, OSError):
-                data = {}
+        data = _read_session_file()
         data["auth_method"] = "outlook_com"
         data["email"] = email_addr
         data["name"] = name
-        SESSION_FILE.write_text(json.dumps(data))
+        _write_session_file(data)
     except Exception:
         logger.exception("Failed to save Outlook COM session")
 
@@ -1121,11 +1536,11 @@ async def outlook_com_disconnect():
     """Disconnect from the local Outlook desktop app."""
     try:
         if SESSION_FILE.exists():
-            data = json.loads(SESSION_FILE.read_text())
+            data = _read_session_file()
             if data.get("auth_method") == "outlook_com":
                 data.pop("auth_method", None)
                 data.pop("name", None)
-            SESSION_FILE.write_text(json.dumps(data))
+            _write_session_file(data)
     except Exception:
         pass
     if _credentials.get("auth_method") == "outlook_com":
@@ -1152,9 +1567,9 @@ def _list_folders_impl(conn: imaplib.IMAP4_SSL) -> List[FolderInfo]:
         try:
             st, data = conn.status(f'"{fname}"', "(MESSAGES UNSEEN)")
             if st == "OK" and data[0]:
-                info = data[0].decode("ascii", errors="replace")
-                msgs = int(re.search(r"MESSAGES (\d+)", info).group(1))
-                unseen = int(re.search(r"UNSEEN (\d+)", info).group(1))
+                counts = {k: int(v) for k, v in _STATUS_ITEM_RE.findall(data[0])}
+                msgs = counts.get(b"MESSAGES", 0)
+                unseen = counts.get(b"UNSEEN", 0)
             else:
                 msgs, unseen = 0, 0
         except Exception:
@@ -1202,27 +1617,40 @@ def _list_emails_impl(
     skip: int = 0, top: int = 25,
 ) -> tuple[List[EmailSummary], int]:
     folder = folder_id or "INBOX"
-    conn.select(f'"{folder}"', readonly=True)
+    sel_status, sel_data = conn.select(f'"{folder}"', readonly=True)
 
     criteria = _build_search_criteria(
         search=search, from_date=from_date, to_date=to_date,
         sender=sender, has_attachments=None, is_read=is_read,
     )
 
-    status, data = conn.uid("SEARCH", None, criteria)
-    if status != "OK" or not data[0]:
-        return [], 0
+    if criteria == "ALL":
+        # Unfiltered: page by sequence number using the EXISTS count from
+        # SELECT instead of transferring every UID via SEARCH ALL.
+        try:
+            total = int(sel_data[0]) if sel_status == "OK" else 0
+        except (TypeError, ValueError, IndexError):
+            total = 0
+        hi = total - skip
+        if hi < 1:
+            return [], total
+        lo = max(1, hi - top + 1)
+        status, fetch_data = conn.fetch(f"{lo}:{hi}", "(UID FLAGS BODY.PEEK[]<0.65536>)")
+    else:
+        status, data = conn.uid("SEARCH", None, criteria)
+        if status != "OK" or not data[0]:
+            return [], 0
 
-    all_uids = data[0].split()
-    all_uids.reverse()  # newest first
-    total = len(all_uids)
+        all_uids = data[0].split()
+        all_uids.reverse()  # newest first
+        total = len(all_uids)
 
-    page_uids = all_uids[skip:skip + top]
-    if not page_uids:
-        return [], total
+        page_uids = all_uids[skip:skip + top]
+        if not page_uids:
+            return [], total
 
-    uid_str = b",".join(page_uids)
-    status, fetch_data = conn.uid("FETCH", uid_str, "(UID FLAGS BODY.PEEK[]<0.65536>)")
+        uid_str = b",".join(page_uids)
+        status, fetch_data = conn.uid("FETCH", uid_str, "(UID FLAGS BODY.PEEK[]<0.65536>)")
 
     emails = []
     for uid_int, flags, raw_bytes in _parse_fetch_response(fetch_data):
@@ -1281,8 +1709,7 @@ def _get_email_impl(conn: imaplib.IMAP4_SSL, folder: str, uid: str) -> EmailDeta
     cc_list = _parse_address_list(msg.get("Cc", ""))
     bcc_list = _parse_address_list(msg.get("Bcc", ""))
     date_str = _parse_date(msg)
-    text_body, html_body = _get_body(msg)
-    attachments = _get_attachments(msg)
+    text_body, html_body, attachments = _walk_once(msg)
     imp = _parse_importance(msg)
     is_seen = "\\Seen" in flags
     is_flagged = "\\Flagged" in flags
@@ -1317,8 +1744,54 @@ def _get_email_impl(conn: imaplib.IMAP4_SSL, folder: str, uid: str) -> EmailDeta
     )
 
 
+# (account, folder, uid) → attachment list parsed from BODYSTRUCTURE
+_BODYSTRUCTURE_CACHE: OrderedDict[tuple[str, str, str], list[dict]] = OrderedDict()
+_BODYSTRUCTURE_CACHE_SIZE = 256
+
+
+def _get_attachment_sections(conn: imaplib.IMAP4_SSL, folder: str, uid: str) -> list[dict] | None:
+    """Return cached BODYSTRUCTURE attachment info, or None if it can't be used."""
+    key = (_credentials.get("email", ""), folder, uid)
+    if key in _BODYSTRUCTURE_CACHE:
+        _BODYSTRUCTURE_CACHE.move_to_end(key)
+        return _BODYSTRUCTURE_CACHE[key]
+    status, data = conn.uid("FETCH", uid, "(BODYSTRUCTURE)")
+    if status != "OK" or not data or data[0] is None:
+        return None
+    try:
+        body = _find_imap_item(_parse_imap_response(data), b"BODYSTRUCTURE")
+        sections = _bodystructure_attachments(body)
+    except _UnsupportedStructure:
+        return None
+    _BODYSTRUCTURE_CACHE[key] = sections
+    if len(_BODYSTRUCTURE_CACHE) > _BODYSTRUCTURE_CACHE_SIZE:
+        _BODYSTRUCTURE_CACHE.popitem(last=False)
+    return sections
+
+
 def _download_attachment_impl(conn: imaplib.IMAP4_SSL, folder: str, uid: str, att_idx: int):
     conn.select(f'"{folder}"', readonly=True)
+
+    # Fast path: fetch only the attachment's MIME section
+    sections = _get_attachment_sections(conn, folder, uid)
+    if sections is not None:
+        if not 0 <= att_idx < len(sections):
+            raise HTTPException(status_code=404, detail="Attachment not found")
+        sec = sections[att_idx]
+        status, data = conn.uid("FETCH", uid, f"(BODY.PEEK[{sec['section']}])")
+        raw = next((item[1] for item in data or [] if isinstance(item, tuple)), None)
+        if status == "OK" and raw is not None:
+            try:
+                content = _decode_transfer_encoding(raw, sec["encoding"])
+            except (binascii.Error, ValueError):
+                content = None
+            if content is not None:
+                return (
+                    sec["name"] or f"attachment_{att_idx}",
+                    sec["content_type"] or "application/octet-stream",
+                    content,
+                )
+
     status, data = conn.uid("FETCH", uid, "(BODY.PEEK[])")
     if status != "OK" or not data or not isinstance(data[0], tuple):
         raise HTTPException(status_code=404, detail="Email not found")
@@ -1407,8 +1880,12 @@ def _load_emails_from_cache(
         if is_read is not None:
             q = q.filter(ScrapedEmail.is_read == is_read)
 
-        total = q.count()
         rows = q.order_by(ScrapedEmail.date.desc()).offset(skip).limit(top).all()
+        # A short page means we've reached the end — no need to count
+        if len(rows) < top and (rows or skip == 0):
+            total = skip + len(rows)
+        else:
+            total = q.with_entities(func.count(ScrapedEmail.id)).scalar() or 0
         emails = []
         for r in rows:
             body_preview = ""
@@ -1596,14 +2073,12 @@ async def list_stored_attachments(file_type: Optional[str] = None):
 async def serve_attachment(filename: str):
     """Download a stored attachment."""
     filepath = _validate_attachment_filename(filename)
-    content = filepath.read_bytes()
-    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    content_type = _guess_type(filename)
     metadata = _read_attachment_metadata()
     original_name = metadata.get(filename, {}).get("original_name", filename)
-    return Response(
-        content=content, media_type=content_type,
-        headers={"Content-Disposition": f'attachment; filename="{original_name}"'},
-    )
+    # FileResponse streams from disk (sendfile where available) instead of
+    # loading the whole attachment into memory.
+    return FileResponse(filepath, media_type=content_type, filename=original_name)
 
 
 @app.get("/api/attachments/{filename}/preview")
@@ -1612,13 +2087,13 @@ async def preview_attachment(filename: str):
     filepath = _validate_attachment_filename(filename)
     metadata = _read_attachment_metadata()
     meta = metadata.get(filename, {})
-    content_type = meta.get("content_type", mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    content_type = meta.get("content_type") or _guess_type(filename)
 
     if content_type in IMAGE_TYPES or content_type in PDF_TYPES:
-        content = filepath.read_bytes()
-        return Response(
-            content=content, media_type=content_type,
-            headers={"Content-Disposition": f'inline; filename="{meta.get("original_name", filename)}"'},
+        return FileResponse(
+            filepath, media_type=content_type,
+            filename=meta.get("original_name", filename),
+            content_disposition_type="inline",
         )
 
     return {
@@ -1639,6 +2114,49 @@ class ZipDownloadRequest(BaseModel):
     filenames: Optional[List[str]] = None  # None = all attachments
 
 
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only, unseekable sink that hands ZIP output back in chunks."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# Per-entry deflate level.  ZipFile(compresslevel=...) only reaches entries
+# opened by name, which would drop the per-type compress_type and the file's
+# mtime from ZipInfo.from_file; the ZipInfo field is public only from 3.13.
+_ZINFO_LEVEL_ATTR = "compress_level" if sys.version_info >= (3, 13) else "_compresslevel"
+
+
+def _iter_zip(entries: list[tuple[Path, str, str]]):
+    """Yield a ZIP archive of (filepath, arc_name, content_type) entries as it is built."""
+    buf = _ZipStreamBuffer()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for filepath, arc_name, content_type in entries:
+            zinfo = zipfile.ZipInfo.from_file(filepath, arc_name)
+            zinfo.compress_type = _zip_compress_type(content_type)
+            setattr(zinfo, _ZINFO_LEVEL_ATTR, 1)
+            with open(filepath, "rb") as src, zf.open(zinfo, "w") as dst:
+                while chunk := src.read(_COPY_CHUNK):
+                    dst.write(chunk)
+                    if data := buf.drain():
+                        yield data
+            if data := buf.drain():
+                yield data
+    yield buf.drain()
+
+
 @app.post("/api/attachments/download-zip")
 async def download_attachments_zip(request: ZipDownloadRequest):
     """Download multiple attachments as a ZIP file."""
@@ -1648,26 +2166,28 @@ async def download_attachments_zip(request: ZipDownloadRequest):
     else:
         filenames = list(metadata.keys())
 
-    if not filenames:
+    entries = []
+    arc_names: set[str] = set()
+    for fname in filenames:
+        filepath = ATTACHMENTS_DIR / fname
+        if not filepath.is_file():
+            continue
+        meta = metadata.get(fname, {})
+        original_name = meta.get("original_name", fname)
+        # Avoid duplicate names in ZIP by prefixing with UID part
+        arc_name = original_name
+        if arc_name in arc_names:
+            arc_name = f"{fname.split('_')[0]}_{original_name}"
+        arc_names.add(arc_name)
+        content_type = meta.get("content_type") or _guess_type(fname)
+        entries.append((filepath, arc_name, content_type))
+
+    if not entries:
         raise HTTPException(status_code=404, detail="No attachments found")
 
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        for fname in filenames:
-            filepath = ATTACHMENTS_DIR / fname
-            if not filepath.exists():
-                continue
-            original_name = metadata.get(fname, {}).get("original_name", fname)
-            # Avoid duplicate names in ZIP by prefixing with UID part
-            arc_name = original_name
-            if arc_name in [info.filename for info in zf.infolist()]:
-                arc_name = f"{fname.split('_')[0]}_{original_name}"
-            zf.write(filepath, arc_name)
-
-    buf.seek(0)
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    return Response(
-        content=buf.getvalue(), media_type="application/zip",
+    return StreamingResponse(
+        _iter_zip(entries), media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="attachments_{ts}.zip"'},
     )
 
@@ -1680,6 +2200,7 @@ def _scrape_impl(
     sender_filter: str = None, subject_filter: str = None,
     search: str = None,
     max_results: int = 50, include_attachments: bool = True,
+    stats: Optional[dict] = None,
 ) -> List[ScrapedEmailData]:
     folder = folder_id or "INBOX"
     conn.select(f'"{folder}"', readonly=True)
@@ -1702,6 +2223,7 @@ def _scrape_impl(
 
     # Fetch in batches of 25
     all_emails = []
+    pipeline_jobs = []
     for i in range(0, len(uids_to_fetch), 25):
         batch = uids_to_fetch[i:i + 25]
         uid_str = b",".join(batch)
@@ -1716,8 +2238,8 @@ def _scrape_impl(
             to_list = _parse_address_list(msg.get("To", ""))
             cc_list = _parse_address_list(msg.get("Cc", ""))
             date_str = _parse_date(msg)
-            text_body, html_body = _get_body(msg)
-            atts = _get_attachments(msg)
+            # Saved attachments are measured as they stream to disk
+            text_body, html_body, atts = _walk_once(msg, attachment_sizes=not include_attachments)
             is_seen = "\\Seen" in flags
 
             scraped_atts = []
@@ -1727,10 +2249,11 @@ def _scrape_impl(
                         name=a["name"], content_type=a["content_type"],
                         size=a["size"], is_inline=a["is_inline"],
                     )
-                    result = _get_attachment_by_index(msg, a["index"])
-                    if result:
-                        saved_filename = _save_attachment_with_metadata(
-                            content=result[2], uid=parsed_uid, index=a["index"],
+                    found = _find_attachment_part(msg, a["index"])
+                    if found:
+                        saved_filename, att_info.size = _save_attachment_with_metadata(
+                            content=_iter_part_payload(found[2]),
+                            uid=parsed_uid, index=a["index"],
                             original_name=a["name"], content_type=a["content_type"],
                             email_subject=subject, email_sender=from_addr,
                             email_date=date_str,
@@ -1740,21 +2263,16 @@ def _scrape_impl(
                         att_info.download_url = f"/api/attachments/{saved_filename}"
                         att_info.preview_url = f"/api/attachments/{saved_filename}/preview"
 
-                        # ── Candidate pipeline: process resumes/CVs ──
+                        # ── Candidate pipeline: queue resumes/CVs ──
                         file_type = _classify_file_type(a["content_type"])
                         if file_type in ("document", "pdf"):
-                            try:
-                                process_attachment_into_candidate(
-                                    attachment_filepath=str(ATTACHMENTS_DIR / saved_filename),
-                                    email_uid=str(parsed_uid),
-                                    email_body=text_body or "",
-                                    email_sender=from_addr,
-                                    email_subject=subject,
-                                )
-                            except Exception:
-                                logger.exception(
-                                    "Candidate pipeline failed for %s", saved_filename
-                                )
+                            pipeline_jobs.append(dict(
+                                attachment_filepath=str(ATTACHMENTS_DIR / saved_filename),
+                                email_uid=str(parsed_uid),
+                                email_body=text_body or "",
+                                email_sender=from_addr,
+                                email_subject=subject,
+                            ))
 
                     scraped_atts.append(att_info)
             else:
@@ -1782,39 +2300,51 @@ def _scrape_impl(
                 categories=[], attachments=scraped_atts,
             ))
 
+    # Candidate pipeline: parse all queued resumes/CVs in parallel
+    saved = process_attachments_into_candidates(pipeline_jobs)
+    if stats is not None:
+        stats["candidates_added"] = sum(1 for r in saved if r)
+
     return all_emails
 
 
+_SCRAPED_EMAIL_UPSERT_COLS = (
+    "folder", "subject", "sender", "sender_email", "date", "body_text",
+    "body_html", "has_attachments", "attachment_count", "is_read", "scraped_at",
+)
+
+
 def _persist_scraped_emails(emails: List[ScrapedEmailData], folder: str = "INBOX"):
     """Upsert scraped emails into SQLite for cache persistence."""
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+    if not emails:
+        return
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "uid": em.id, "folder": folder, "subject": em.subject,
+            "sender": em.sender_name, "sender_email": em.sender_email,
+            "date": em.received,
+            "body_text": em.body if em.body_type == "text" else "",
+            "body_html": em.body if em.body_type == "html" else "",
+            "has_attachments": em.has_attachments,
+            "attachment_count": len(em.attachments) if em.attachments else 0,
+            "is_read": em.is_read, "scraped_at": now,
+        }
+        for em in emails
+    ]
+
+    # One compiled upsert, executed for all rows (executemany) in one transaction
+    stmt = sqlite_insert(ScrapedEmail)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["uid"],
+        set_={col: stmt.excluded[col] for col in _SCRAPED_EMAIL_UPSERT_COLS},
+    )
+
     db = SessionLocal()
     try:
-        for em in emails:
-            existing = db.query(ScrapedEmail).filter(ScrapedEmail.uid == em.id).first()
-            body_text = em.body if em.body_type == "text" else ""
-            body_html = em.body if em.body_type == "html" else ""
-            att_count = len(em.attachments) if em.attachments else 0
-
-            if existing:
-                existing.folder = folder
-                existing.subject = em.subject
-                existing.sender = em.sender_name
-                existing.sender_email = em.sender_email
-                existing.date = em.received
-                existing.body_text = body_text
-                existing.body_html = body_html
-                existing.has_attachments = em.has_attachments
-                existing.attachment_count = att_count
-                existing.is_read = em.is_read
-                existing.scraped_at = datetime.now(timezone.utc)
-            else:
-                db.add(ScrapedEmail(
-                    uid=em.id, folder=folder, subject=em.subject,
-                    sender=em.sender_name, sender_email=em.sender_email,
-                    date=em.received, body_text=body_text, body_html=body_html,
-                    has_attachments=em.has_attachments, attachment_count=att_count,
-                    is_read=em.is_read,
-                ))
+        db.execute(stmt, rows)
         db.commit()
         logger.info("Persisted %d scraped emails to SQLite", len(emails))
     except Exception:
@@ -1824,6 +2354,13 @@ def _persist_scraped_emails(emails: List[ScrapedEmailData], folder: str = "INBOX
         db.close()
 
 
+# Concurrent Graph message fetches per scrape (shares graph_client.HTTP_SESSION)
+_GRAPH_FETCH_WORKERS = 8
+
+# Messages whose attachments are held in memory at once during a Graph scrape
+_GRAPH_SCRAPE_BATCH = 25
+
+
 def _scrape_via_graph(
     folder_id: str = None, from_date: str = None, to_date: str = None,
     sender_filter: str = None, subject_filter: str = None, search: str = None,
@@ -1850,95 +2387,132 @@ def _scrape_via_graph(
         "search": search or subject_filter,
     })
 
+    # Messages go through in bounded batches: fetch, download, decode and save
+    # one batch's attachments, then let go of their bytes before the next.
+    msg_ids = [m["id"] for m in result.get("messages", [])]
     all_emails = []
-    for msg_summary in result.get("messages", []):
-        msg_id = msg_summary["id"]
-        full_msg = graph_client.get_message(msg_id)
+    pipeline_jobs = []
+    with ThreadPoolExecutor(max_workers=_GRAPH_FETCH_WORKERS) as pool:
+        for i in range(0, len(msg_ids), _GRAPH_SCRAPE_BATCH):
+            batch_ids = msg_ids[i:i + _GRAPH_SCRAPE_BATCH]
+            # map() preserves the listing order
+            full_msgs = list(pool.map(graph_client.get_message, batch_ids))
+            batch_atts = [[] for _ in batch_ids]
+            if include_attachments:
+                batch_atts = _save_graph_attachments(batch_ids, full_msgs, pipeline_jobs)
+
+            for msg_id, full_msg, scraped_atts in zip(batch_ids, full_msgs, batch_atts):
+                text_body = full_msg.get("body_text", "")
+                html_body = full_msg.get("body_html", "")
+
+                all_emails.append(ScrapedEmailData(
+                    id=msg_id,
+                    subject=full_msg.get("subject", ""),
+                    sender_name=full_msg.get("sender", ""),
+                    sender_email=full_msg.get("sender_email", ""),
+                    to=[RecipientInfo(name=r["name"], email=r["email"]) for r in full_msg.get("to", [])],
+                    cc=[RecipientInfo(name=r["name"], email=r["email"]) for r in full_msg.get("cc", [])],
+                    received=full_msg.get("date", ""),
+                    sent=full_msg.get("date", ""),
+                    body_type="html" if html_body else "text",
+                    body=html_body or text_body,
+                    is_read=full_msg.get("is_read", False),
+                    has_attachments=full_msg.get("has_attachments", False),
+                    importance=full_msg.get("importance", "normal"),
+                    internet_message_id=full_msg.get("internet_message_id", ""),
+                    conversation_id=full_msg.get("conversation_id", ""),
+                    categories=full_msg.get("categories", []),
+                    attachments=scraped_atts,
+                ))
 
-        text_body = full_msg.get("body_text", "")
-        html_body = full_msg.get("body_html", "")
+    # Candidate pipeline: parse all queued resumes/CVs in parallel
+    process_attachments_into_candidates(pipeline_jobs)
 
-        scraped_atts = []
-        if include_attachments and full_msg.get("attachments"):
-            for att in full_msg["attachments"]:
-                att_info = ScrapedAttachmentInfo(
-                    name=att.get("name", ""),
-                    content_type=att.get("content_type", ""),
-                    size=att.get("size", 0),
-                    is_inline=att.get("is_inline", False),
-                )
+    return all_emails
 
-                content_bytes_b64 = att.get("content_bytes")
-                if content_bytes_b64:
-                    try:
-                        content = base64.b64decode(content_bytes_b64)
-                    except Exception:
-                        content = None
-                else:
-                    try:
-                        content = graph_client.download_attachment(msg_id, att["id"])
-                    except Exception:
-                        content = None
-
-                if content:
-                    saved_filename = _save_attachment_with_metadata(
-                        content=content, uid=msg_id[:16], index=0,
-                        original_name=att.get("name", "attachment"),
-                        content_type=att.get("content_type", ""),
-                        email_subject=full_msg.get("subject", ""),
-                        email_sender=full_msg.get("sender_email", ""),
-                        email_date=full_msg.get("date", ""),
-                    )
-                    att_info.saved_path = str(ATTACHMENTS_DIR / saved_filename)
-                    att_info.filename = saved_filename
-                    att_info.download_url = f"/api/attachments/{saved_filename}"
-                    att_info.preview_url = f"/api/attachments/{saved_filename}/preview"
 
-                    # Candidate pipeline: process resumes/CVs
-                    file_type = _classify_file_type(att.get("content_type", ""))
-                    if file_type in ("document", "pdf"):
-                        try:
-                            process_attachment_into_candidate(
-                                attachment_filepath=str(ATTACHMENTS_DIR / saved_filename),
-                                email_uid=msg_id,
-                                email_body=text_body or "",
-                                email_sender=full_msg.get("sender_email", ""),
-                                email_subject=full_msg.get("subject", ""),
-                            )
-                        except Exception:
-                            logger.exception(
-                                "Candidate pipeline failed for %s", saved_filename
-                            )
+def _save_graph_attachments(
+    msg_ids: list[str], full_msgs: list[dict], pipeline_jobs: list[dict],
+) -> list[list[ScrapedAttachmentInfo]]:
+    """
+    Save one batch of Graph messages' attachments to disk.
 
-                scraped_atts.append(att_info)
+    Queues resumes/CVs onto ``pipeline_jobs`` and returns the attachment
+    infos per message.  Inlined ``content_bytes`` are dropped from
+    ``full_msgs`` once decoded.
+    """
+    # Attachments not inlined by $expand (large files) are fetched in $batch calls
+    downloaded = graph_client.download_attachments([
+        (msg_id, att["id"])
+        for msg_id, full_msg in zip(msg_ids, full_msgs)
+        for att in full_msg.get("attachments") or []
+        if not att.get("content_bytes") and att.get("id")
+    ])
 
-        all_emails.append(ScrapedEmailData(
-            id=msg_id,
-            subject=full_msg.get("subject", ""),
-            sender_name=full_msg.get("sender", ""),
-            sender_email=full_msg.get("sender_email", ""),
-            to=[RecipientInfo(name=r["name"], email=r["email"]) for r in full_msg.get("to", [])],
-            cc=[RecipientInfo(name=r["name"], email=r["email"]) for r in full_msg.get("cc", [])],
-            received=full_msg.get("date", ""),
-            sent=full_msg.get("date", ""),
-            body_type="html" if html_body else "text",
-            body=html_body or text_body,
-            is_read=full_msg.get("is_read", False),
-            has_attachments=full_msg.get("has_attachments", False),
-            importance=full_msg.get("importance", "normal"),
-            internet_message_id=full_msg.get("internet_message_id", ""),
-            conversation_id=full_msg.get("conversation_id", ""),
-            categories=full_msg.get("categories", []),
-            attachments=scraped_atts,
-        ))
+    batch_atts = []
+    save_jobs, save_targets = [], []
+    for msg_id, full_msg in zip(msg_ids, full_msgs):
+        scraped_atts = []
+        file_key = _message_file_key(msg_id)
+        for att_pos, att in enumerate(full_msg.get("attachments") or []):
+            att_info = ScrapedAttachmentInfo(
+                name=att.get("name", ""),
+                content_type=att.get("content_type", ""),
+                size=att.get("size", 0),
+                is_inline=att.get("is_inline", False),
+            )
 
-    return all_emails
+            content_bytes_b64 = att.pop("content_bytes", None)
+            if content_bytes_b64:
+                try:
+                    content = graph_client.decode_content_bytes(content_bytes_b64)
+                except Exception:
+                    content = None
+            else:
+                content = downloaded.pop((msg_id, att.get("id")), None)
+
+            if content:
+                save_jobs.append(dict(
+                    content=content, uid=file_key, index=att_pos,
+                    original_name=att.get("name", "attachment"),
+                    content_type=att.get("content_type", ""),
+                    email_subject=full_msg.get("subject", ""),
+                    email_sender=full_msg.get("sender_email", ""),
+                    email_date=full_msg.get("date", ""),
+                ))
+                save_targets.append((msg_id, full_msg, att, att_info))
+
+            scraped_atts.append(att_info)
+        batch_atts.append(scraped_atts)
+    del downloaded
+
+    saved_filenames = _save_attachments(save_jobs)
+    del save_jobs
+
+    # Link saved files and queue resumes/CVs for the candidate pipeline
+    for (msg_id, full_msg, att, att_info), (saved_filename, _) in zip(save_targets, saved_filenames):
+        att_info.saved_path = str(ATTACHMENTS_DIR / saved_filename)
+        att_info.filename = saved_filename
+        att_info.download_url = f"/api/attachments/{saved_filename}"
+        att_info.preview_url = f"/api/attachments/{saved_filename}/preview"
+
+        file_type = _classify_file_type(att.get("content_type", ""))
+        if file_type in ("document", "pdf"):
+            pipeline_jobs.append(dict(
+                attachment_filepath=str(ATTACHMENTS_DIR / saved_filename),
+                email_uid=msg_id,
+                email_body=full_msg.get("body_text", "") or "",
+                email_sender=full_msg.get("sender_email", ""),
+                email_subject=full_msg.get("subject", ""),
+            ))
+    return batch_atts
 
 
 def _scrape_via_outlook_com(
     folder_id: str = None, from_date: str = None, to_date: str = None,
     sender_filter: str = None, subject_filter: str = None, search: str = None,
     max_results: int = 50, include_attachments: bool = True,
+    stats: Optional[dict] = None,
 ) -> List[ScrapedEmailData]:
     """Scrape emails via Outlook COM automation — mirrors _scrape_impl logic."""
     filters = {
@@ -1953,6 +2527,7 @@ def _scrape_via_outlook_com(
     msgs = result.get("messages", [])
 
     all_emails: List[ScrapedEmailData] = []
+    pipeline_jobs = []
     for m in msgs:
         msg_id = m["id"]
         subject = m.get("subject", "") or "(No Subject)"
@@ -1971,16 +2546,17 @@ def _scrape_via_outlook_com(
             except Exception:
                 att_list = []
 
+            file_key = _message_file_key(msg_id)
             for att in att_list:
                 att_idx = att["index"]
                 att_name = att.get("name", f"attachment_{att_idx}")
                 safe_name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", att_name)
-                unique_filename = f"{msg_id[:16]}_{att_idx}_{safe_name}"
+                unique_filename = f"{file_key}_{att_idx}_{safe_name}"
                 save_dest = ATTACHMENTS_DIR / unique_filename
 
                 att_info = ScrapedAttachmentInfo(
                     name=att_name,
-                    content_type=mimetypes.guess_type(att_name)[0] or "application/octet-stream",
+                    content_type=_guess_type(att_name),
                     size=att.get("size", 0),
                     is_inline=False,
                 )
@@ -1992,7 +2568,7 @@ def _scrape_via_outlook_com(
                     # Persist attachment metadata
                     _save_attachment_with_metadata(
                         content=save_dest.read_bytes(),
-                        uid=msg_id[:16], index=att_idx,
+                        uid=file_key, index=att_idx,
                         original_name=att_name, content_type=content_type,
                         email_subject=subject, email_sender=sender_email_addr,
                         email_date=date_str,
@@ -2002,21 +2578,16 @@ def _scrape_via_outlook_com(
                     att_info.download_url = f"/api/attachments/{unique_filename}"
                     att_info.preview_url = f"/api/attachments/{unique_filename}/preview"
 
-                    # Candidate pipeline: process resumes/CVs
+                    # Candidate pipeline: queue resumes/CVs
                     file_type = _classify_file_type(content_type)
                     if file_type in ("document", "pdf"):
-                        try:
-                            process_attachment_into_candidate(
-                                attachment_filepath=str(save_dest),
-                                email_uid=msg_id,
-                                email_body=text_body or "",
-                                email_sender=sender_email_addr,
-                                email_subject=subject,
-                            )
-                        except Exception:
-                            logger.exception(
-                                "Candidate pipeline failed for %s", unique_filename
-                            )
+                        pipeline_jobs.append(dict(
+                            attachment_filepath=str(save_dest),
+                            email_uid=msg_id,
+                            email_body=text_body or "",
+                            email_sender=sender_email_addr,
+                            email_subject=subject,
+                        ))
                 except Exception:
                     logger.exception("Failed to save attachment %s", att_name)
 
@@ -2036,6 +2607,11 @@ def _scrape_via_outlook_com(
             categories=[], attachments=scraped_atts,
         ))
 
+    # Candidate pipeline: parse all queued resumes/CVs in parallel
+    saved = process_attachments_into_candidates(pipeline_jobs)
+    if stats is not None:
+        stats["candidates_added"] = sum(1 for r in saved if r)
+
     return all_emails
 
 
@@ -2080,45 +2656,71 @@ async def scrape_emails(request: ScrapeRequest):
     )
 
 
+class _Echo:
+    """Pseudo-file for csv.writer: ``write`` hands the formatted row back."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _iter_csv(header: list, rows: Iterable[list]) -> Iterator[str]:
+    """Yield a CSV document row by row."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _iter_export_json(result: ScrapeResult) -> Iterator[str]:
+    """Yield a ScrapeResult as JSON one email at a time."""
+    yield f'{{"total_scraped": {result.total_scraped}, "emails": ['
+    for i, em in enumerate(result.emails):
+        # Pydantic's compiled serializer — no intermediate dict, no default=str walk
+        yield (",\n" if i else "\n") + em.model_dump_json()
+    yield f'\n], "exported_at": {orjson.dumps(result.exported_at).decode()}}}'
+
+
 @app.post("/api/export/json")
 async def export_json(request: ScrapeRequest):
     result = await scrape_emails(request)
-    content = json.dumps(result.model_dump(), indent=2, default=str)
-    return Response(
-        content=content, media_type="application/json",
+    return StreamingResponse(
+        _iter_export_json(result), media_type="application/json",
         headers={
             "Content-Disposition": f'attachment; filename="outlook_export_{datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")}.json"'
         },
     )
 
 
-@app.post("/api/export/csv")
-async def export_csv(request: ScrapeRequest):
-    result = await scrape_emails(request)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
-        "Subject", "Sender Name", "Sender Email", "To", "CC",
-        "Received", "Sent", "Is Read", "Has Attachments",
-        "Importance", "Categories", "Attachment Names",
-        "Attachment Filenames", "Attachment Paths",
-        "Internet Message ID", "Conversation ID",
-    ])
-    for em in result.emails:
+_EMAIL_CSV_HEADER = [
+    "Subject", "Sender Name", "Sender Email", "To", "CC",
+    "Received", "Sent", "Is Read", "Has Attachments",
+    "Importance", "Categories", "Attachment Names",
+    "Attachment Filenames", "Attachment Paths",
+    "Internet Message ID", "Conversation ID",
+]
+
+
+def _email_csv_rows(emails: List[ScrapedEmailData]) -> Iterator[list]:
+    for em in emails:
         to_str = "; ".join([f"{r.name} <{r.email}>" for r in em.to])
         cc_str = "; ".join([f"{r.name} <{r.email}>" for r in em.cc])
         att_names = "; ".join([a.name for a in em.attachments])
         att_filenames = "; ".join([a.filename for a in em.attachments if a.filename])
         att_paths = "; ".join([a.saved_path for a in em.attachments if a.saved_path])
-        writer.writerow([
+        yield [
             em.subject, em.sender_name, em.sender_email, to_str, cc_str,
             em.received, em.sent, em.is_read, em.has_attachments,
             em.importance, "; ".join(em.categories), att_names,
             att_filenames, att_paths,
             em.internet_message_id, em.conversation_id,
-        ])
-    return Response(
-        content=output.getvalue(), media_type="text/csv",
+        ]
+
+
+@app.post("/api/export/csv")
+async def export_csv(request: ScrapeRequest):
+    result = await scrape_emails(request)
+    return StreamingResponse(
+        _iter_csv(_EMAIL_CSV_HEADER, _email_csv_rows(result.emails)), media_type="text/csv",
         headers={
             "Content-Disposition": f'attachment; filename="outlook_export_{datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")}.csv"'
         },
@@ -2127,6 +2729,11 @@ async def export_csv(request: ScrapeRequest):
 
 # ─── Stats ──────────────────────────────────────────────────────────────────
 
+# From header (with folded continuation lines) in a HEADER.FIELDS (FROM) fetch
+_FROM_HEADER_RE = re.compile(rb'^From:[ \t]*(.*(?:\r?\n[ \t].*)*)', re.MULTILINE | re.IGNORECASE)
+_FOLD_RE = re.compile(rb'\r?\n[ \t]+')
+
+
 def _get_stats_impl(conn: imaplib.IMAP4_SSL) -> MailboxStats:
     folders = _list_folders_impl(conn)
     total_emails = sum(f.total_count for f in folders)
@@ -2134,35 +2741,39 @@ def _get_stats_impl(conn: imaplib.IMAP4_SSL) -> MailboxStats:
     folder_stats = [FolderStatInfo(name=f.name, total=f.total_count, unread=f.unread_count) for f in folders]
 
     # Emails in last 7 days
-    conn.select('"INBOX"', readonly=True)
+    sel_status, sel_data = conn.select('"INBOX"', readonly=True)
     week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%d-%b-%Y")
     st, data = conn.uid("SEARCH", None, f"SINCE {week_ago}")
     recent_count = len(data[0].split()) if st == "OK" and data[0] else 0
 
-    # Top senders from last 50 emails
-    st, data = conn.uid("SEARCH", None, "ALL")
+    # Top senders from last 50 emails — sequence numbers follow UID order, so
+    # the newest 50 are EXISTS-49..EXISTS (no SEARCH ALL over the mailbox)
+    try:
+        exists = int(sel_data[0]) if sel_status == "OK" else 0
+    except (TypeError, ValueError, IndexError):
+        exists = 0
     sender_counts: dict[str, TopSenderInfo] = {}
-    if st == "OK" and data[0]:
-        all_uids = data[0].split()
-        all_uids.reverse()
-        recent_uids = all_uids[:50]
-        if recent_uids:
-            uid_str = b",".join(recent_uids)
-            st2, fetch_data = conn.uid("FETCH", uid_str, "(BODY.PEEK[HEADER.FIELDS (FROM)])")
-            if st2 == "OK":
-                for item in fetch_data:
-                    if not isinstance(item, tuple):
-                        continue
-                    try:
-                        header_bytes = item[1] if len(item) > 1 else item[0]
-                        msg = email.message_from_bytes(header_bytes)
-                        from_name, from_addr = _parse_address(msg.get("From", ""))
-                        if from_addr and from_addr not in sender_counts:
-                            sender_counts[from_addr] = TopSenderInfo(name=from_name, email=from_addr, count=0)
-                        if from_addr:
-                            sender_counts[from_addr].count += 1
-                    except Exception:
+    if exists > 0:
+        st2, fetch_data = conn.fetch(
+            f"{max(1, exists - 49)}:{exists}", "(BODY.PEEK[HEADER.FIELDS (FROM)])",
+        )
+        if st2 == "OK":
+            for item in fetch_data:
+                if not isinstance(item, tuple):
+                    continue
+                try:
+                    header_bytes = item[1] if len(item) > 1 else item[0]
+                    m = _FROM_HEADER_RE.search(header_bytes)
+                    if not m:
                         continue
+                    raw_from = _FOLD_RE.sub(b" ", m.group(1)).strip()
+                    from_name, from_addr = _parse_address(raw_from.decode("utf-8", "replace"))
+                    if from_addr and from_addr not in sender_counts:
+                        sender_counts[from_addr] = TopSenderInfo(name=from_name, email=from_addr, count=0)
+                    if from_addr:
+                        sender_counts[from_addr].count += 1
+                except Exception:
+                    continue
 
     top_senders = sorted(sender_counts.values(), key=lambda x: x.count, reverse=True)[:10]
 
@@ -2199,107 +2810,131 @@ class TagsUpdateRequest(BaseModel):
 
 # ─── Recruitment: Candidate endpoints ───────────────────────────────────────
 
-def _normalize_name(name: str) -> str:
-    """Lowercase, strip whitespace and punctuation for duplicate comparison."""
-    return re.sub(r'[^a-z ]', '', (name or "").lower()).strip()
-
-
-def _email_domain(addr: str) -> str:
-    """Extract the domain from an email address."""
-    if not addr or "@" not in addr:
-        return ""
-    return addr.split("@")[1].lower().strip()
-
-
-def _detect_duplicates(candidates: list) -> list:
+def _detect_duplicates(candidates: list, keys: list[tuple] | None = None) -> list:
     """
     Mark duplicate candidates.  Two candidates are duplicates if:
     - Their normalized names are identical, OR
+    - Their email addresses are identical, OR
     - They share the same email domain AND have similar names
       (one name is a subset of the other, first names match, or
       Jaccard similarity > 0.5 on words).
 
+    Duplicate groups are the connected components of that relation.  Pairs
+    are only compared within blocking buckets (name, email, domain + word) —
+    every rule above implies the pair shares at least one bucket.
+
+    ``keys`` optionally supplies the persisted ``(name_normalized,
+    email_domain)`` columns per candidate (input order); missing values are
+    computed on the fly.
+
     Returns the input list with added 'duplicate_group_id' and 'is_duplicate' keys.
-    The earliest created_at in each group is the "original" (is_duplicate=False).
+    The earliest created_at (then lowest id) in each group is the "original"
+    (is_duplicate=False); its id is the group id, so a page of candidates and
+    the full listing agree on it.
     """
     # Sort by created_at ascending so earliest comes first
-    sorted_cands = sorted(candidates, key=lambda c: c.get("created_at") or "")
-
-    # Build lookup structures
-    groups: dict[int, list[int]] = {}   # group_id -> [indices]
-    cand_group: dict[int, int] = {}     # index -> group_id
-    next_group = 1
-
-    for i, ci in enumerate(sorted_cands):
-        if i in cand_group:
-            continue
-        norm_i = _normalize_name(ci.get("name"))
-        domain_i = _email_domain(ci.get("email") or "")
-        words_i = set(norm_i.split()) if norm_i else set()
-
-        for j in range(i + 1, len(sorted_cands)):
-            if j in cand_group and cand_group.get(i) and cand_group[j] == cand_group[i]:
-                continue  # already in same group
-            cj = sorted_cands[j]
-            norm_j = _normalize_name(cj.get("name"))
-            domain_j = _email_domain(cj.get("email") or "")
-            words_j = set(norm_j.split()) if norm_j else set()
-
-            is_dup = False
-
-            # Exact normalized name match
-            if norm_i and norm_j and norm_i == norm_j:
-                is_dup = True
-            # Exact email match (different name spellings)
-            elif ci.get("email") and cj.get("email") and ci["email"].lower() == cj["email"].lower():
-                is_dup = True
-            # Same email domain + similar name
-            elif domain_i and domain_j and domain_i == domain_j and words_i and words_j:
-                intersection = words_i & words_j
-                union = words_i | words_j
-                # Jaccard similarity > 0.5
-                if union and len(intersection) / len(union) > 0.5:
-                    is_dup = True
-                # One name is a subset of the other (e.g. "Alice J" vs "Alice Johnson")
-                elif words_i <= words_j or words_j <= words_i:
-                    is_dup = True
-                # First names match
-                elif norm_i.split()[0] == norm_j.split()[0]:
-                    is_dup = True
-
-            if is_dup:
-                gid_i = cand_group.get(i)
-                gid_j = cand_group.get(j)
-                if gid_i and not gid_j:
-                    cand_group[j] = gid_i
-                    groups[gid_i].append(j)
-                elif gid_j and not gid_i:
-                    cand_group[i] = gid_j
-                    groups[gid_j].append(i)
-                elif not gid_i and not gid_j:
-                    gid = next_group
-                    next_group += 1
-                    cand_group[i] = gid
-                    cand_group[j] = gid
-                    groups[gid] = [i, j]
-                # else both already assigned — may be different groups, merge:
-                elif gid_i != gid_j:
-                    # merge gid_j into gid_i
-                    for idx in groups[gid_j]:
-                        cand_group[idx] = gid_i
-                    groups[gid_i].extend(groups[gid_j])
-                    del groups[gid_j]
+    order = sorted(
+        range(len(candidates)),
+        key=lambda i: (candidates[i].get("created_at") or "", candidates[i].get("id") or 0),
+    )
+    sorted_cands = [candidates[i] for i in order]
+    n = len(sorted_cands)
+
+    # Per-candidate comparison keys, computed once
+    emails_lc = [(c.get("email") or "").lower() for c in sorted_cands]
+    if keys is None:
+        keys = [(None, None)] * len(candidates)
+    norms, domains = [], []
+    for i, c, addr in zip(order, sorted_cands, emails_lc):
+        norm, domain = keys[i]
+        norms.append(norm if norm is not None else normalize_name(c.get("name")))
+        domains.append(domain if domain is not None else email_domain(addr))
+    words = [frozenset(nm.split()) for nm in norms]
+    first_words = [nm.split()[0] if nm else "" for nm in norms]
+
+    def is_duplicate(i: int, j: int) -> bool:
+        # Exact normalized name match
+        if norms[i] and norms[i] == norms[j]:
+            return True
+        # Exact email match (different name spellings)
+        if emails_lc[i] and emails_lc[i] == emails_lc[j]:
+            return True
+        # Same email domain + similar name
+        wi, wj = words[i], words[j]
+        if domains[i] and domains[i] == domains[j] and wi and wj:
+            # Jaccard similarity > 0.5
+            if len(wi & wj) / len(wi | wj) > 0.5:
+                return True
+            # One name is a subset of the other (e.g. "Alice J" vs "Alice Johnson")
+            if wi <= wj or wj <= wi:
+                return True
+            # First names match
+            if first_words[i] == first_words[j]:
+                return True
+        return False
+
+    # Union-find over candidate indices
+    parent = list(range(n))
+    rank = [0] * n
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a: int, b: int) -> None:
+        ra, rb = find(a), find(b)
+        if ra == rb:
+            return
+        if rank[ra] < rank[rb]:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        if rank[ra] == rank[rb]:
+            rank[ra] += 1
+
+    # Blocking buckets
+    exact_buckets: dict[tuple, list[int]] = defaultdict(list)
+    domain_buckets: dict[tuple, list[int]] = defaultdict(list)
+    for i in range(n):
+        if norms[i]:
+            exact_buckets[("name", norms[i])].append(i)
+        if emails_lc[i]:
+            exact_buckets[("email", emails_lc[i])].append(i)
+        if domains[i]:
+            for word in words[i]:
+                domain_buckets[(domains[i], word)].append(i)
+
+    # Same normalized name / same email: always duplicates
+    for members in exact_buckets.values():
+        for idx in members[1:]:
+            union(members[0], idx)
+
+    # Same domain + shared word: check the similarity rules per pair
+    for members in domain_buckets.values():
+        for pos, a in enumerate(members):
+            for b in members[pos + 1:]:
+                if find(a) != find(b) and is_duplicate(a, b):
+                    union(a, b)
+
+    # Collect components in order of their earliest member
+    components: dict[int, list[int]] = {}
+    for i in range(n):
+        components.setdefault(find(i), []).append(i)
 
     # Apply flags
     for c in sorted_cands:
         c["duplicate_group_id"] = None
         c["is_duplicate"] = False
 
-    for gid, indices in groups.items():
-        for rank, idx in enumerate(indices):
+    for indices in components.values():
+        if len(indices) < 2:
+            continue
+        gid = sorted_cands[indices[0]].get("id")
+        for pos, idx in enumerate(indices):
             sorted_cands[idx]["duplicate_group_id"] = gid
             # First in the group (earliest created_at) is the original
-            if rank > 0:
+            if pos > 0:
                 sorted_cands[idx]["is_duplicate"] = True
 
     # Re-sort by created_at descending (newest first) to match original ordering
@@ -2307,14 +2942,101 @@ def _detect_duplicates(candidates: list) -> list:
     return sorted_cands
 
 
+# Upper bound for a single /api/candidates page
+_CANDIDATE_PAGE_MAX = 500
+
+# Domain + name-word terms OR-ed into one neighbour query (SQLite caps
+# expression depth at 1000)
+_NEIGHBOUR_TERMS_PER_QUERY = 200
+
+
+def _duplicate_neighbours(q, rows: list) -> list:
+    """
+    Candidates in ``q`` outside ``rows`` that share a duplicate group with them.
+
+    Every rule in :func:`_detect_duplicates` implies a shared normalized name,
+    a shared email, or a shared domain plus a shared name word, so each round
+    looks up exactly those keys.  Rounds repeat from the newly found rows until
+    none turn up, so groups match the unpaginated listing.
+    """
+    seen_ids = {r.id for r in rows}
+    seen_norms, seen_emails, seen_pairs = set(), set(), set()
+    found = []
+    frontier = rows
+    while frontier:
+        norms = {r.name_normalized for r in frontier if r.name_normalized} - seen_norms
+        emails = {r.email.lower() for r in frontier if r.email} - seen_emails
+        pairs = {
+            (r.email_domain, word)
+            for r in frontier if r.email_domain and r.name_normalized
+            for word in r.name_normalized.split()
+        } - seen_pairs
+        seen_norms |= norms
+        seen_emails |= emails
+        seen_pairs |= pairs
+
+        conds = []
+        if norms:
+            conds.append(Candidate.name_normalized.in_(norms))
+        if emails:
+            conds.append(func.lower(Candidate.email).in_(emails))
+        # Normalized names are lowercase words joined by spaces — no LIKE wildcards
+        padded_name = " " + Candidate.name_normalized + " "
+        conds.extend(
+            and_(Candidate.email_domain == domain, padded_name.like(f"% {word} %"))
+            for domain, word in sorted(pairs)
+        )
+
+        frontier = []
+        for i in range(0, len(conds), _NEIGHBOUR_TERMS_PER_QUERY):
+            batch = (
+                q.filter(or_(*conds[i:i + _NEIGHBOUR_TERMS_PER_QUERY]))
+                .with_entities(
+                    Candidate.id, Candidate.name, Candidate.email, Candidate.created_at,
+                    Candidate.name_normalized, Candidate.email_domain,
+                )
+                .all()
+            )
+            for row in batch:
+                if row.id not in seen_ids:
+                    seen_ids.add(row.id)
+                    frontier.append(row)
+        found.extend(frontier)
+    return found
+
+
+def _encode_candidate_cursor(c: Candidate) -> str:
+    return f"{c.created_at.isoformat()}|{c.id}"
+
+
+def _decode_candidate_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts, cid = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(cid)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/candidates")
 async def list_candidates(
+    response: Response,
     skill: Optional[str] = None,
     location: Optional[str] = None,
     name: Optional[str] = None,
     tag: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
 ):
-    """List all candidates with optional filters and duplicate detection."""
+    """
+    List candidates with optional filters and duplicate detection.
+
+    Without ``limit`` every match is returned.  With ``limit`` one newest-first
+    page is returned (keyset ``cursor``, or ``offset``); the filtered total and
+    the next cursor are sent as ``X-Total-Count`` / ``X-Next-Cursor`` headers,
+    and duplicates are resolved through the page's indexed neighbours — the
+    flags match what the unpaginated listing reports for the same rows.
+    """
     db = SessionLocal()
     try:
         q = db.query(Candidate)
@@ -2327,13 +3049,61 @@ async def list_candidates(
             q = q.filter(Candidate.skills.ilike(f"%{skill}%"))
         if tag:
             q = q.filter(Candidate.tags.ilike(f"%{tag}%"))
-        candidates = q.order_by(Candidate.created_at.desc()).all()
-        result = [_candidate_to_dict(c) for c in candidates]
-        return _detect_duplicates(result)
+
+        if limit is None:
+            candidates = q.order_by(Candidate.created_at.desc()).all()
+            result = [_candidate_to_dict(c) for c in candidates]
+            keys = [(c.name_normalized, c.email_domain) for c in candidates]
+            return _detect_duplicates(result, keys)
+
+        limit = max(1, min(limit, _CANDIDATE_PAGE_MAX))
+        response.headers["X-Total-Count"] = str(
+            q.with_entities(func.count(Candidate.id)).scalar() or 0
+        )
+
+        page_q = q.order_by(Candidate.created_at.desc(), Candidate.id.desc())
+        if cursor:
+            ts, cid = _decode_candidate_cursor(cursor)
+            page_q = page_q.filter(or_(
+                Candidate.created_at < ts,
+                and_(Candidate.created_at == ts, Candidate.id < cid),
+            ))
+        elif offset > 0:
+            page_q = page_q.offset(offset)
+        page = page_q.limit(limit).all()
+        if len(page) == limit:
+            response.headers["X-Next-Cursor"] = _encode_candidate_cursor(page[-1])
+
+        neighbours = _duplicate_neighbours(q, page)
+
+        result = [_candidate_to_dict(c) for c in page]
+        keys = [(c.name_normalized, c.email_domain) for c in page]
+        for row in neighbours:
+            result.append({
+                "id": row.id, "name": row.name, "email": row.email,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+            })
+            keys.append((row.name_normalized, row.email_domain))
+        _detect_duplicates(result, keys)
+        # Flags are set in place; return only the page, in page order
+        return result[:len(page)]
     finally:
         db.close()
 
 
+@functools.lru_cache(maxsize=512)
+def _extract_resume_text(path_str: str, mtime_ns: int, size: int) -> str:
+    """Text of a resume file; mtime/size in the key invalidate stale entries."""
+    p = Path(path_str)
+    suffix = p.suffix.lower()
+    if suffix == ".pdf":
+        return extract_text_from_pdf(p)
+    elif suffix in (".docx", ".doc"):
+        return extract_text_from_docx(p)
+    else:
+        return p.read_text(encoding="utf-8", errors="replace")
+
+
 def _read_resume_text(raw_resume_path: str | None) -> str:
     """Extract readable text from a resume file (PDF/DOCX/TXT)."""
     if not raw_resume_path:
@@ -2342,15 +3112,10 @@ def _read_resume_text(raw_resume_path: str | None) -> str:
         p = Path(raw_resume_path)
         if not p.is_absolute():
             p = Path(__file__).resolve().parent / raw_resume_path
-        if not p.exists() or not p.is_file():
+        st = p.stat()
+        if not stat.S_ISREG(st.st_mode):
             return ""
-        suffix = p.suffix.lower()
-        if suffix == ".pdf":
-            return extract_text_from_pdf(p)
-        elif suffix in (".docx", ".doc"):
-            return extract_text_from_docx(p)
-        else:
-            return p.read_text(encoding="utf-8", errors="replace")
+        return _extract_resume_text(str(p), st.st_mtime_ns, st.st_size)
     except Exception:
         return ""
 
@@ -2431,6 +3196,7 @@ async def delete_candidate(candidate_id: int):
         if not c:
             raise HTTPException(status_code=404, detail="Candidate not found")
         db.query(MatchResult).filter(MatchResult.candidate_id == candidate_id).delete()
+        db.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id == candidate_id))
         db.delete(c)
         db.commit()
         return {"detail": f"Candidate {candidate_id} deleted"}
@@ -2473,7 +3239,6 @@ async def update_candidate_tags(candidate_id: int, body: TagsUpdateRequest):
 @app.post("/api/jobs/upload-jd")
 async def upload_jd(file: UploadFile = File(...)):
     """Parse a JD file (PDF/DOCX) and return extracted fields for preview."""
-    import tempfile
 
     filename = (file.filename or "").lower()
     if not filename.endswith((".pdf", ".docx", ".doc")):
@@ -2497,7 +3262,7 @@ async def upload_jd(file: UploadFile = File(...)):
             raise HTTPException(status_code=422, detail="Could not extract text from file")
 
         # Run entity extraction
-        entities = extract_entities(raw_text)
+        entities = cached_extract_entities(raw_text)
 
         # Check for remote indicators in the text
         remote_ok = bool(re.search(r'\b(remote|work from home|wfh|hybrid|telecommute)\b', raw_text, re.IGNORECASE))
@@ -2549,10 +3314,13 @@ async def list_jobs():
 # ─── Recruitment: Matching endpoints ────────────────────────────────────────
 
 @app.post("/api/jobs/{job_id}/match")
-async def run_matching(job_id: int):
-    """Run the matching engine for a job against all candidates. Saves results."""
+async def run_matching(job_id: int, only_high: bool = False):
+    """
+    Run the matching engine for a job against all candidates. Saves results.
+    ``only_high`` keeps (and stores) only high-fit candidates.
+    """
     try:
-        results = run_match(job_id)
+        results = run_match(job_id, only_high=only_high)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -2578,15 +3346,15 @@ async def get_match_results(job_id: int):
             raise HTTPException(status_code=404, detail="Job not found")
 
         matches = (
-            db.query(MatchResult)
+            db.query(MatchResult, Candidate)
+            .outerjoin(Candidate, MatchResult.candidate_id == Candidate.id)
             .filter(MatchResult.job_id == job_id)
             .order_by(MatchResult.score.desc())
             .all()
         )
 
         results = []
-        for mr in matches:
-            c = db.query(Candidate).filter(Candidate.id == mr.candidate_id).first()
+        for mr, c in matches:
             results.append({
                 "match_id": mr.id,
                 "candidate": _candidate_to_dict(c) if c else None,
@@ -2606,84 +3374,100 @@ async def get_match_results(job_id: int):
 
 # ─── Recruitment: CSV export ────────────────────────────────────────────────
 
+_MATCH_CSV_HEADER = [
+    "Rank", "Name", "Email", "Phone", "Location", "Titles", "Skills",
+    "Years Experience", "Match Score", "Fit Level", "Match Reasons", "Job Title",
+]
+_CANDIDATE_CSV_HEADER = [
+    "Name", "Email", "Phone", "Location", "Titles", "Skills",
+    "Years Experience", "Source Email UID", "Created At",
+]
+
+
+def _joined_list(raw: str | None) -> str:
+    """Render a JSON-array text column as a "; "-separated cell."""
+    return "; ".join(orjson.loads(raw)) if raw else ""
+
+
+def _match_csv_rows(job_id: int, job_title: str) -> Iterator[list]:
+    """Rows for a job's match results, best score first."""
+    db = SessionLocal()
+    try:
+        matches = (
+            db.query(MatchResult, Candidate)
+            .join(Candidate, MatchResult.candidate_id == Candidate.id)
+            .filter(MatchResult.job_id == job_id)
+            .order_by(MatchResult.score.desc())
+            .yield_per(200)
+        )
+        for rank, (mr, c) in enumerate(matches, 1):
+            yield [
+                rank,
+                c.name,
+                c.email or "",
+                c.phone or "",
+                c.location or "",
+                _joined_list(c.titles),
+                _joined_list(c.skills),
+                c.years_exp or "",
+                mr.score,
+                mr.fit_level or "",
+                _joined_list(mr.match_reasons),
+                job_title,
+            ]
+    finally:
+        db.close()
+
+
+def _candidate_csv_rows() -> Iterator[list]:
+    """Rows for every candidate, newest first."""
+    db = SessionLocal()
+    try:
+        for c in db.query(Candidate).order_by(Candidate.created_at.desc()).yield_per(200):
+            yield [
+                c.name,
+                c.email or "",
+                c.phone or "",
+                c.location or "",
+                _joined_list(c.titles),
+                _joined_list(c.skills),
+                c.years_exp or "",
+                c.source_email_uid or "",
+                c.created_at.isoformat() if c.created_at else "",
+            ]
+    finally:
+        db.close()
+
+
 @app.get("/api/export/candidates-csv")
 async def export_candidates_csv(job_id: Optional[int] = None):
-    """Export match results (or all candidates) as CSV via pandas."""
-    import pandas as pd
-
+    """Export match results (or all candidates) as a streamed CSV."""
     db = SessionLocal()
     try:
         if job_id:
             job = db.query(JobRequisition).filter(JobRequisition.id == job_id).first()
             if not job:
                 raise HTTPException(status_code=404, detail="Job not found")
-
-            matches = (
-                db.query(MatchResult)
-                .filter(MatchResult.job_id == job_id)
-                .order_by(MatchResult.score.desc())
-                .all()
-            )
-            if not matches:
+            if not db.query(MatchResult.id).filter(MatchResult.job_id == job_id).first():
                 raise HTTPException(status_code=404, detail="No match results found. Run matching first.")
 
-            rows = []
-            for mr in matches:
-                c = db.query(Candidate).filter(Candidate.id == mr.candidate_id).first()
-                if not c:
-                    continue
-                rows.append({
-                    "Rank": None,
-                    "Name": c.name,
-                    "Email": c.email or "",
-                    "Phone": c.phone or "",
-                    "Location": c.location or "",
-                    "Titles": "; ".join(json.loads(c.titles) if c.titles else []),
-                    "Skills": "; ".join(json.loads(c.skills) if c.skills else []),
-                    "Years Experience": c.years_exp or "",
-                    "Match Score": mr.score,
-                    "Fit Level": mr.fit_level or "",
-                    "Match Reasons": "; ".join(json.loads(mr.match_reasons) if mr.match_reasons else []),
-                    "Job Title": job.title,
-                })
-            # Fill rank after sorting (already sorted by score desc)
-            for i, row in enumerate(rows, 1):
-                row["Rank"] = i
-
+            header, rows = _MATCH_CSV_HEADER, _match_csv_rows(job_id, job.title)
             filename = f"match_results_job{job_id}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv"
         else:
-            candidates = db.query(Candidate).order_by(Candidate.created_at.desc()).all()
-            if not candidates:
+            if not db.query(Candidate.id).first():
                 raise HTTPException(status_code=404, detail="No candidates in database")
 
-            rows = []
-            for c in candidates:
-                rows.append({
-                    "Name": c.name,
-                    "Email": c.email or "",
-                    "Phone": c.phone or "",
-                    "Location": c.location or "",
-                    "Titles": "; ".join(json.loads(c.titles) if c.titles else []),
-                    "Skills": "; ".join(json.loads(c.skills) if c.skills else []),
-                    "Years Experience": c.years_exp or "",
-                    "Source Email UID": c.source_email_uid or "",
-                    "Created At": c.created_at.isoformat() if c.created_at else "",
-                })
-
+            header, rows = _CANDIDATE_CSV_HEADER, _candidate_csv_rows()
             filename = f"candidates_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv"
-
-        df = pd.DataFrame(rows)
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-
-        return Response(
-            content=output.getvalue(),
-            media_type="text/csv",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-        )
     finally:
         db.close()
 
+    return StreamingResponse(
+        _iter_csv(header, rows),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 
 # ─── Health Check ───────────────────────────────────────────────────────────
 
@@ -2697,107 +3481,110 @@ def _human_size(size_bytes: int) -> str:
     return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
 
 
+_STORAGE_EXT_TYPES = {
+    "jpg": "image", "jpeg": "image", "png": "image", "gif": "image",
+    "webp": "image", "bmp": "image", "svg": "image",
+    "pdf": "pdf", "docx": "docx", "doc": "doc",
+}
+
+
 @app.get("/api/storage/health")
-async def storage_health():
+async def storage_health(db: Session = Depends(get_db)):
     """Comprehensive storage and persistence health check."""
-    from sqlalchemy import func
-
-    db = SessionLocal()
-    try:
-        # ── 1. Database section ──
-        db_size = DB_PATH.stat().st_size if DB_PATH.exists() else 0
-
-        # ── 2. Record counts ──
-        candidates_count = db.query(func.count(Candidate.id)).scalar() or 0
-        jobs_count = db.query(func.count(JobRequisition.id)).scalar() or 0
-        match_count = db.query(func.count(MatchResult.id)).scalar() or 0
-        emails_count = db.query(func.count(ScrapedEmail.id)).scalar() or 0
-        attachments_count = db.query(func.count(Attachment.id)).scalar() or 0
-        notes_count = db.query(func.count(Candidate.id)).filter(
+    # ── 1. Database section ──
+    db_size = DB_PATH.stat().st_size if DB_PATH.exists() else 0
+
+    # ── 2. Record counts + 3. Sync timestamps (one round trip) ──
+    # Every candidate figure comes out of a single aggregate pass
+    cand = select(
+        func.count().label("total"),
+        func.count().filter(
             Candidate.notes.isnot(None), Candidate.notes != "",
-        ).scalar() or 0
-        tagged_count = db.query(func.count(Candidate.id)).filter(
+        ).label("with_notes"),
+        func.count().filter(
             Candidate.tags.isnot(None), Candidate.tags != "[]",
-        ).scalar() or 0
-
-        # ── 3. Sync timestamps ──
-        last_scraped = db.query(func.max(ScrapedEmail.scraped_at)).scalar()
-        last_candidate = db.query(func.max(Candidate.created_at)).scalar()
-        last_match = db.query(func.max(MatchResult.id)).scalar()
+        ).label("tagged"),
+        func.max(Candidate.created_at).label("last_created"),
+    ).subquery()
+    (
+        candidates_count, notes_count, tagged_count, last_candidate,
+        jobs_count, match_count, emails_count, last_scraped, last_match_time,
+    ) = db.query(
+        cand.c.total, cand.c.with_notes, cand.c.tagged, cand.c.last_created,
+        select(func.count(JobRequisition.id)).scalar_subquery(),
+        select(func.count(MatchResult.id)).scalar_subquery(),
+        select(func.count(ScrapedEmail.id)).scalar_subquery(),
+        select(func.max(ScrapedEmail.scraped_at)).scalar_subquery(),
         # For last match, get the actual match result's job run time
-        last_match_time = None
-        if last_match:
-            mr = db.query(MatchResult).filter(MatchResult.id == last_match).first()
-            if mr and mr.job:
-                last_match_time = mr.job.created_at
-
-        imap_connected = False
-        if _imap_connection:
-            try:
-                _imap_connection.noop()
-                imap_connected = True
-            except Exception:
-                pass
+        select(JobRequisition.created_at)
+        .join(MatchResult, MatchResult.job_id == JobRequisition.id)
+        .order_by(MatchResult.id.desc())
+        .limit(1)
+        .scalar_subquery(),
+    ).one()
+
+    imap_connected = False
+    if _imap_connection:
+        try:
+            _imap_connection.noop()
+            imap_connected = True
+        except Exception:
+            pass
 
-        # ── 4. Attachments on disk ──
-        att_files = [f for f in ATTACHMENTS_DIR.iterdir()
-                     if f.is_file() and f.name != "_metadata.json"]
-        total_att_size = sum(f.stat().st_size for f in att_files)
-        by_type = {}
-        for f in att_files:
-            ext = f.suffix.lower().lstrip(".")
-            if ext in ("jpg", "jpeg", "png", "gif", "webp", "bmp", "svg"):
-                key = "image"
-            elif ext == "pdf":
-                key = "pdf"
-            elif ext in ("docx", "doc"):
-                key = ext
-            else:
-                key = "other"
-            by_type[key] = by_type.get(key, 0) + 1
-
-        # ── 5. Health status ──
-        if not DB_PATH.exists():
-            health_status = "warning"
-        elif candidates_count == 0 and emails_count == 0:
-            health_status = "empty"
-        elif not SESSION_FILE.exists():
-            health_status = "warning"
-        else:
-            health_status = "healthy"
+    # ── 4. Attachments on disk ──
+    # scandir entries carry the file type (and on Windows, the size) from the
+    # directory read itself, so there's no extra stat per file for filtering
+    att_count = 0
+    total_att_size = 0
+    by_type = Counter()
+    with os.scandir(ATTACHMENTS_DIR) as it:
+        for entry in it:
+            if entry.name == "_metadata.json" or not entry.is_file():
+                continue
+            att_count += 1
+            total_att_size += entry.stat().st_size
+            ext = os.path.splitext(entry.name)[1].lower().lstrip(".")
+            by_type[_STORAGE_EXT_TYPES.get(ext, "other")] += 1
 
-        return {
-            "database": {
-                "db_file_path": str(DB_PATH.resolve()),
-                "db_size_bytes": db_size,
-                "db_size_human": _human_size(db_size),
-            },
-            "record_counts": {
-                "candidates": candidates_count,
-                "jobs": jobs_count,
-                "match_results": match_count,
-                "scraped_emails": emails_count,
-                "attachments": attachments_count,
-                "notes_count": notes_count,
-                "tagged_count": tagged_count,
-            },
-            "sync": {
-                "last_scraped_at": last_scraped.isoformat() if last_scraped else None,
-                "last_candidate_added": last_candidate.isoformat() if last_candidate else None,
-                "last_match_run": last_match_time.isoformat() if last_match_time else None,
-                "session_file_exists": SESSION_FILE.exists(),
-                "imap_connected": imap_connected,
-            },
-            "attachments": {
-                "total_files": len(att_files),
-                "total_size_bytes": total_att_size,
-                "total_size_human": _human_size(total_att_size),
-                "by_type": by_type,
-            },
-            "health_status": health_status,
-        }
-    finally:
-        db.close()
+    # ── 5. Health status ──
+    if not DB_PATH.exists():
+        health_status = "warning"
+    elif candidates_count == 0 and emails_count == 0:
+        health_status = "empty"
+    elif not SESSION_FILE.exists():
+        health_status = "warning"
+    else:
+        health_status = "healthy"
+
+    return {
+        "database": {
+            "db_file_path": str(DB_PATH.resolve()),
+            "db_size_bytes": db_size,
+            "db_size_human": _human_size(db_size),
+        },
+        "record_counts": {
+            "candidates": candidates_count,
+            "jobs": jobs_count,
+            "match_results": match_count,
+            "scraped_emails": emails_count,
+            "notes_count": notes_count,
+            "tagged_count": tagged_count,
+        },
+        "sync": {
+            "last_scraped_at": last_scraped.isoformat() if last_scraped else None,
+            "last_candidate_added": last_candidate.isoformat() if last_candidate else None,
+            "last_match_run": last_match_time.isoformat() if last_match_time else None,
+            "session_file_exists": SESSION_FILE.exists(),
+            "imap_connected": imap_connected,
+        },
+        "attachments": {
+            "total_files": att_count,
+            "total_size_bytes": total_att_size,
+            "total_size_human": _human_size(total_att_size),
+            "by_type": dict(by_type),
+        },
+        "health_status": health_status,
+    }
 
 
 class ClearDataRequest(BaseModel):
@@ -2811,12 +3598,13 @@ async def clear_data(body: ClearDataRequest):
         raise HTTPException(status_code=400, detail='Body must contain {"confirm": "CONFIRM"}')
     db = SessionLocal()
     try:
-        db.query(MatchResult).delete()
-        db.query(Candidate).delete()
-        db.query(JobRequisition).delete()
-        db.query(ScrapedEmail).delete()
-        db.query(Attachment).delete()
+        # Core DELETEs without WHERE (children first) let SQLite use its
+        # truncate optimization; no ORM session sync, one commit
+        for model in (MatchResult, CandidateSkill, Candidate, JobRequisition,
+                      ScrapedEmail, Attachment):
+            db.execute(delete(model))
         db.commit()
+        invalidate_job_skill_cache()
         return {"deleted": True, "message": "All records cleared. Files on disk were preserved."}
     except Exception:
         db.rollback()
@@ -2828,8 +3616,6 @@ async def clear_data(body: ClearDataRequest):
 @app.get("/api/storage/backup")
 async def backup_database():
     """Download a copy of the SQLite database file."""
-    import shutil
-    import tempfile
 
     if not DB_PATH.exists():
         raise HTTPException(status_code=404, detail="Database file not found")
@@ -2838,110 +3624,100 @@ async def backup_database():
     tmp.close()
     tmp_path = Path(tmp.name)
     try:
-        shutil.copy2(DB_PATH, tmp_path)
-        content = tmp_path.read_bytes()
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        return Response(
-            content=content,
-            media_type="application/octet-stream",
-            headers={"Content-Disposition": f'attachment; filename="mailscraper_backup_{date_str}.db"'},
-        )
-    finally:
+        await asyncio.to_thread(vacuum_into, tmp_path)
+    except Exception:
         tmp_path.unlink(missing_ok=True)
+        raise
+    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    # Stream the snapshot from disk and delete it once the response is sent
+    return FileResponse(
+        tmp_path,
+        media_type="application/octet-stream",
+        filename=f"mailscraper_backup_{date_str}.db",
+        background=BackgroundTask(tmp_path.unlink, missing_ok=True),
+    )
 
 
 # ─── Scheduled Scrape ───────────────────────────────────────────────────────
 
 async def run_scheduled_scrape():
     """Execute a scrape using saved SchedulerConfig settings."""
-    db = SessionLocal()
-    try:
+    with SessionLocal() as db:
         cfg = db.query(SchedulerConfig).first()
         if not cfg:
             return
         if not cfg.enabled:
             return
-    finally:
-        db.close()
-
-    auth = get_auth_method()
-
-    # Check we have valid credentials for the active auth method
-    if auth == "outlook_com":
-        pass  # no stored credentials needed — COM talks to local Outlook
-    elif auth == "imap":
-        if not _credentials.get("email") or not _credentials.get("password"):
-            logger.warning("Scheduled scrape skipped — no IMAP credentials")
-            return
-    else:
-        logger.warning("Scheduled scrape skipped — auth method '%s' not supported", auth)
-        return
+        folder = cfg.folder or "INBOX"
+        subject_filter = cfg.subject_filter
 
-    # Count candidates before scrape
-    db = SessionLocal()
-    try:
-        cand_before = db.query(Candidate).count()
-    finally:
-        db.close()
+        auth = get_auth_method()
 
-    # Run the scrape via the appropriate backend
-    try:
+        # Check we have valid credentials for the active auth method
         if auth == "outlook_com":
-            emails = _scrape_via_outlook_com(
-                folder_id=cfg.folder or "INBOX",
-                subject_filter=cfg.subject_filter,
-                max_results=50,
-                include_attachments=True,
-            )
+            pass  # no stored credentials needed — COM talks to local Outlook
+        elif auth == "imap":
+            if not _credentials.get("email") or not _credentials.get("password"):
+                logger.warning("Scheduled scrape skipped — no IMAP credentials")
+                return
         else:
-            emails = await _imap_op(
-                _scrape_impl,
-                folder_id=cfg.folder or "INBOX",
-                subject_filter=cfg.subject_filter,
-                max_results=50,
-                include_attachments=True,
-            )
-        _persist_scraped_emails(emails, folder=cfg.folder or "INBOX")
-    except Exception:
-        logger.exception("Scheduled scrape failed (auth=%s)", auth)
-        return
-
-    # Count candidates after scrape
-    db = SessionLocal()
-    try:
-        cand_after = db.query(Candidate).count()
-        new_candidates = max(0, cand_after - cand_before)
+            logger.warning("Scheduled scrape skipped — auth method '%s' not supported", auth)
+            return
 
-        now = datetime.now(timezone.utc)
-        cfg = db.query(SchedulerConfig).first()
-        if cfg:
-            cfg.last_run_at = now
-            cfg.emails_found_last_run = len(emails)
-            cfg.candidates_added_last_run = new_candidates
-            cfg.next_run_at = now + timedelta(minutes=cfg.interval_minutes or 30)
-            db.commit()
+        # Run the scrape via the appropriate backend; the pipeline reports
+        # how many candidates it saved into scrape_stats
+        scrape_stats: dict = {}
+        try:
+            if auth == "outlook_com":
+                emails = _scrape_via_outlook_com(
+                    folder_id=folder,
+                    subject_filter=subject_filter,
+                    max_results=50,
+                    include_attachments=True,
+                    stats=scrape_stats,
+                )
+            else:
+                emails = await _imap_op(
+                    _scrape_impl,
+                    folder_id=folder,
+                    subject_filter=subject_filter,
+                    max_results=50,
+                    include_attachments=True,
+                    stats=scrape_stats,
+                )
+            _persist_scraped_emails(emails, folder=folder)
+        except Exception:
+            logger.exception("Scheduled scrape failed (auth=%s)", auth)
+            return
 
-        # Create scrape_complete notification
         try:
+            new_candidates = scrape_stats.get("candidates_added", 0)
+
+            now = datetime.now(timezone.utc)
+            db.expire_all()   # re-read cfg: it may have been edited mid-scrape
+            cfg = db.query(SchedulerConfig).first()
+            if cfg:
+                cfg.last_run_at = now
+                cfg.emails_found_last_run = len(emails)
+                cfg.candidates_added_last_run = new_candidates
+                cfg.next_run_at = now + timedelta(minutes=cfg.interval_minutes or 30)
+
+            # scrape_complete notification goes out in the same commit
             db.add(Notification(
                 type="scrape_complete",
                 title="Scrape Complete",
                 message=f"Found {len(emails)} emails, {new_candidates} new candidates",
             ))
             db.commit()
+            _invalidate_sched_cfg_cache()
+
+            logger.info(
+                "Scheduled scrape complete: %d emails, %d new candidates",
+                len(emails), new_candidates,
+            )
         except Exception:
             db.rollback()
-            logger.exception("Failed to create scrape_complete notification")
-
-        logger.info(
-            "Scheduled scrape complete: %d emails, %d new candidates",
-            len(emails), new_candidates,
-        )
-    except Exception:
-        db.rollback()
-        logger.exception("Failed to update scheduler stats")
-    finally:
-        db.close()
+            logger.exception("Failed to update scheduler stats")
 
 
 def _scheduler_config_to_dict(cfg: SchedulerConfig) -> dict:
@@ -2968,34 +3744,37 @@ def _scheduler_config_to_dict(cfg: SchedulerConfig) -> dict:
 @app.get("/api/scheduler/status")
 async def scheduler_status():
     """Return current scheduler configuration and runtime status."""
-    db = SessionLocal()
-    try:
-        cfg = db.query(SchedulerConfig).first()
-        if not cfg:
-            cfg = SchedulerConfig(enabled=False, interval_minutes=30, folder="INBOX")
-            db.add(cfg)
-            db.commit()
-            db.refresh(cfg)
-
-        result = _scheduler_config_to_dict(cfg)
-
-        # Is the scheduler job currently registered?
-        job = scheduler.get_job(_SCHEDULER_JOB_ID) if scheduler.running else None
-        result["is_running"] = job is not None
-
-        # Seconds until next run
-        if cfg.next_run_at:
-            next_at = cfg.next_run_at
-            if next_at.tzinfo is None:
-                next_at = next_at.replace(tzinfo=timezone.utc)
-            delta = (next_at - datetime.now(timezone.utc)).total_seconds()
-            result["time_until_next_run_seconds"] = max(0, round(delta))
-        else:
-            result["time_until_next_run_seconds"] = None
+    global _sched_cfg_cache
+    now = time.monotonic()
+    if _sched_cfg_cache is not None and now - _sched_cfg_cache[0] < _SCHED_CFG_TTL:
+        result = dict(_sched_cfg_cache[1])
+    else:
+        db = SessionLocal()
+        try:
+            cfg = db.query(SchedulerConfig).first()
+            if not cfg:
+                cfg = SchedulerConfig(enabled=False, interval_minutes=30, folder="INBOX")
+                db.add(cfg)
+                db.commit()
+                db.refresh(cfg)
+            cfg_dict = _scheduler_config_to_dict(cfg)
+        finally:
+            db.close()
+        _sched_cfg_cache = (now, cfg_dict)
+        result = dict(cfg_dict)
+
+    # Is the scrape loop currently alive?
+    result["is_running"] = _scrape_task is not None and not _scrape_task.done()
+
+    # Seconds until next run (0 while a run is in progress)
+    if _next_run_at is not None:
+        result["time_until_next_run_seconds"] = max(0, round(_next_run_at - now))
+    elif result["is_running"]:
+        result["time_until_next_run_seconds"] = 0
+    else:
+        result["time_until_next_run_seconds"] = None
 
-        return result
-    finally:
-        db.close()
+    return result
 
 
 class SchedulerConfigRequest(BaseModel):
@@ -3026,24 +3805,17 @@ async def update_scheduler_config(body: SchedulerConfigRequest):
         db.commit()
         db.refresh(cfg)
 
-        # Update scheduler job
+        # Restart or stop the scrape loop
         if body.enabled and body.interval_minutes > 0:
-            if scheduler.get_job(_SCHEDULER_JOB_ID):
-                scheduler.remove_job(_SCHEDULER_JOB_ID)
-            scheduler.add_job(
-                run_scheduled_scrape,
-                trigger=IntervalTrigger(minutes=body.interval_minutes),
-                id=_SCHEDULER_JOB_ID,
-                replace_existing=True,
-            )
+            _start_scheduler(body.interval_minutes)
             logger.info("Scheduler enabled: every %d min, folder=%s", body.interval_minutes, body.folder)
         else:
-            if scheduler.get_job(_SCHEDULER_JOB_ID):
-                scheduler.remove_job(_SCHEDULER_JOB_ID)
+            _stop_scheduler()
             cfg.next_run_at = None
             db.commit()
             logger.info("Scheduler disabled")
 
+        _invalidate_sched_cfg_cache()
         return _scheduler_config_to_dict(cfg)
     finally:
         db.close()
@@ -3077,32 +3849,53 @@ def _notification_to_dict(n: Notification) -> dict:
     }
 
 
-@app.get("/api/notifications")
-async def get_notifications(limit: int = 50, offset: int = 0, unread_only: bool = False):
-    """Return notifications ordered by newest first."""
+def _iter_notifications_json(limit: int, offset: int, unread_only: bool) -> Iterator[bytes]:
+    """Yield the notifications page as JSON one row at a time off a streaming cursor."""
     db = SessionLocal()
     try:
         q = db.query(Notification)
         if unread_only:
             q = q.filter(Notification.is_read == False)
         q = q.order_by(Notification.created_at.desc())
-        total = q.count()
-        items = q.offset(offset).limit(limit).all()
-        return {
-            "notifications": [_notification_to_dict(n) for n in items],
-            "total": total,
-        }
+        # One extra row tells us whether another page exists — no COUNT(*)
+        rows = q.offset(offset).limit(limit + 1).yield_per(100)
+        yield b'{"notifications": ['
+        sent = 0
+        for n in rows:
+            if sent == limit:
+                break
+            yield (b"," if sent else b"") + orjson.dumps(_notification_to_dict(n))
+            sent += 1
+        else:
+            yield b'], "has_more": false}'
+            return
+        yield b'], "has_more": true}'
     finally:
         db.close()
 
 
+@app.get("/api/notifications")
+async def get_notifications(limit: int = 50, offset: int = 0, unread_only: bool = False):
+    """Return notifications ordered by newest first."""
+    return StreamingResponse(
+        _iter_notifications_json(max(0, limit), offset, unread_only),
+        media_type="application/json",
+    )
+
+
 @app.get("/api/notifications/count")
 async def get_notification_count():
     """Return count of unread notifications."""
     db = SessionLocal()
     try:
-        unread = db.query(Notification).filter(Notification.is_read == False).count()
-        total = db.query(Notification).count()
+        # Unread count is answered from the partial ix_notifications_unread index
+        unread, total = db.execute(
+            select(
+                select(func.count()).select_from(Notification)
+                .where(Notification.is_read == False).scalar_subquery(),
+                select(func.count()).select_from(Notification).scalar_subquery(),
+            )
+        ).one()
         return {"unread": unread, "total": total}
     finally:
         db.close()
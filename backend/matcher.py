@@ -8,108 +8,236 @@ Scoring rubric (100 pts max):
     Title           15 pts  –  full if any candidate title appears in job title
 """
 
+import functools
 import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from database import SessionLocal, Candidate, JobRequisition, MatchResult
+import orjson
+
+from sqlalchemy import delete, insert, select
+
+from database import SessionLocal, Candidate, CandidateSkill, JobRequisition, MatchResult
 
 logger = logging.getLogger(__name__)
 
 
 # ─── Single-pair scoring ────────────────────────────────────────────────────
 
-def _score_candidate(candidate: Candidate, job: JobRequisition) -> dict:
+def _job_criteria(job: JobRequisition) -> dict:
+    """
+    Parse the job-side inputs once so a match run can reuse them per candidate.
+
+    Plain values only — the dict is shipped to worker processes.
+    """
+    job_loc = (job.location or "").lower()
+    skills = frozenset(s.lower() for s in (json.loads(job.required_skills) if job.required_skills else []))
+    # Job skills interned to bit positions in sorted order, so a candidate's
+    # overlap is one int and decoding it yields names already sorted.
+    names = tuple(sorted(skills))
+    return {
+        "skills": skills,
+        "skill_names": names,
+        "skill_bits": {name: 1 << i for i, name in enumerate(names)},
+        "skills_mask": (1 << len(names)) - 1,
+        "title": job.title,
+        "title_lower": (job.title or "").lower(),
+        "min_exp": job.min_exp or 0,
+        "location": job.location,
+        "loc": job_loc,
+        "loc_tokens": frozenset(job_loc.replace(",", " ").split()),
+        "remote_ok": bool(job.remote_ok),
+    }
+
+
+def _candidate_fields(candidate: Candidate, criteria: dict,
+                      matched_mask: int | None = None) -> tuple:
+    """The (matched_mask, titles, years_exp, location) tuple scoring needs."""
+    if matched_mask is None:
+        bits = criteria["skill_bits"]
+        matched_mask = 0
+        for s in candidate.skills_list:
+            matched_mask |= bits.get(s.lower(), 0)
+    return (matched_mask, candidate.titles_list, candidate.years_exp, candidate.location)
+
+
+def _skill_names(mask: int, criteria: dict) -> list[str]:
+    return [name for i, name in enumerate(criteria["skill_names"]) if mask >> i & 1]
+
+
+def _score_candidate(candidate: Candidate, job: JobRequisition,
+                     criteria: dict | None = None,
+                     matched_mask: int | None = None) -> dict:
     """
     Score one candidate against one job.
 
+    ``criteria`` is the output of ``_job_criteria(job)``; pass it when scoring
+    many candidates against the same job to skip re-parsing the job each time.
+    ``matched_mask`` is the candidate's overlap with the job's skills, as
+    ``criteria["skill_bits"]`` bits, when already known (e.g. from the
+    candidate_skills table).
+
     Returns
     -------
     dict with keys: score (float 0-100), match_reasons (list[str]), fit_level (str)
     """
-    reasons: list[str] = []
-    score = 0.0
+    if criteria is None:
+        criteria = _job_criteria(job)
+    return _score_fields(_candidate_fields(candidate, criteria, matched_mask), criteria)
 
-    cand_skills = {s.lower() for s in (json.loads(candidate.skills) if candidate.skills else [])}
-    job_skills = {s.lower() for s in (json.loads(job.required_skills) if job.required_skills else [])}
-    cand_titles = [t.lower() for t in (json.loads(candidate.titles) if candidate.titles else [])]
-    job_title_lower = (job.title or "").lower()
-    cand_exp = candidate.years_exp or 0
-    min_exp = job.min_exp or 0
-    cand_loc = (candidate.location or "").lower()
-    job_loc = (job.location or "").lower()
+
+def _score_fields(fields: tuple, criteria: dict) -> dict:
+    """Score and explain one ``_candidate_fields`` tuple."""
+    score = _score_numeric(fields, criteria)
+    return {
+        "score": score,
+        "match_reasons": _explain(fields, criteria),
+        "fit_level": _fit_level(score),
+    }
+
+
+def _location_hit(location: str | None, criteria: dict) -> bool:
+    cand_loc = (location or "").lower()
+    return not criteria["loc_tokens"].isdisjoint(cand_loc.replace(",", " ").split())
+
+
+def _title_hits(titles: list, criteria: dict) -> list[str]:
+    job_title_lower = criteria["title_lower"]
+    return [ct for ct in (t.lower() for t in titles) if ct in job_title_lower]
+
+
+def _score_numeric(fields: tuple, criteria: dict) -> float:
+    """
+    Score only — no reason strings.  Picklable; this is what worker
+    processes run.
+    """
+    matched, titles, years_exp, location = fields
+    score = 0.0
 
     # ── 1. Skill overlap  (max 50 pts) ──────────────────────────────────
+    job_skills = criteria["skills"]
+    if job_skills:
+        score += round((matched.bit_count() / len(job_skills)) * 50, 1)
+    else:
+        score += 25
+
+    # ── 2. Experience  (max 20 pts) ─────────────────────────────────────
+    min_exp = criteria["min_exp"]
+    if min_exp <= 0 or (years_exp or 0) >= min_exp:
+        score += 20
+
+    # ── 3. Location  (max 15 pts) ───────────────────────────────────────
+    if criteria["remote_ok"] or not criteria["loc"]:
+        score += 15
+    elif location and _location_hit(location, criteria):
+        score += 15
+
+    # ── 4. Title relevance  (max 15 pts) ────────────────────────────────
+    if not criteria["title_lower"]:
+        score += 15
+    elif titles and _title_hits(titles, criteria):
+        score += 15
+
+    return min(round(score, 1), 100.0)
+
+
+# Anything below this can never be "high" fit
+_HIGH_FIT_MIN = 75
+
+
+def _fit_level(score: float) -> str:
+    if score >= _HIGH_FIT_MIN:
+        return "high"
+    if score >= 45:
+        return "medium"
+    return "low"
+
+
+def _explain(fields: tuple, criteria: dict) -> list[str]:
+    """Human-readable reasons behind ``_score_numeric`` for the same inputs."""
+    matched, titles, years_exp, location = fields
+    reasons: list[str] = []
+
+    job_skills = criteria["skills"]
+    cand_exp = years_exp or 0
+    min_exp = criteria["min_exp"]
+
+    # ── 1. Skill overlap ────────────────────────────────────────────────
     if job_skills:
-        matched = cand_skills & job_skills
-        missing = job_skills - cand_skills
-        skill_score = round((len(matched) / len(job_skills)) * 50, 1)
-        score += skill_score
+        missing = criteria["skills_mask"] & ~matched
         if matched:
-            reasons.append(f"Skills matched ({len(matched)}/{len(job_skills)}): "
-                           f"{', '.join(sorted(matched))}")
+            reasons.append(f"Skills matched ({matched.bit_count()}/{len(job_skills)}): "
+                           f"{', '.join(_skill_names(matched, criteria))}")
         if missing:
-            reasons.append(f"Skills missing ({len(missing)}): "
-                           f"{', '.join(sorted(missing))}")
+            reasons.append(f"Skills missing ({missing.bit_count()}): "
+                           f"{', '.join(_skill_names(missing, criteria))}")
     else:
-        score += 25
         reasons.append("No specific skills required — partial credit")
 
-    # ── 2. Experience  (max 20 pts) ─────────────────────────────────────
+    # ── 2. Experience ───────────────────────────────────────────────────
     if min_exp > 0:
         if cand_exp >= min_exp:
-            score += 20
             reasons.append(f"Experience {cand_exp:.0f}y meets requirement ({min_exp:.0f}y)")
         else:
             gap = min_exp - cand_exp
             reasons.append(f"Experience {cand_exp:.0f}y is {gap:.0f}y short of requirement ({min_exp:.0f}y)")
     else:
-        score += 20
         reasons.append("No minimum experience required")
 
-    # ── 3. Location  (max 15 pts) ───────────────────────────────────────
-    if job.remote_ok:
-        score += 15
+    # ── 3. Location ─────────────────────────────────────────────────────
+    if criteria["remote_ok"]:
         reasons.append("Remote OK — location flexible")
-    elif job_loc and cand_loc:
-        job_tokens = set(job_loc.replace(",", " ").split())
-        cand_tokens = set(cand_loc.replace(",", " ").split())
-        if job_tokens & cand_tokens:
-            score += 15
-            reasons.append(f"Location match: {candidate.location}")
+    elif criteria["loc"] and location:
+        if _location_hit(location, criteria):
+            reasons.append(f"Location match: {location}")
         else:
-            reasons.append(f"Location mismatch: {candidate.location or 'unknown'} vs {job.location}")
-    elif not job_loc:
-        score += 15
+            reasons.append(f"Location mismatch: {location or 'unknown'} vs {criteria['location']}")
+    elif not criteria["loc"]:
         reasons.append("No location requirement")
     else:
         reasons.append("Candidate location unknown")
 
-    # ── 4. Title relevance  (max 15 pts) ────────────────────────────────
-    if job_title_lower and cand_titles:
-        title_hit = any(ct in job_title_lower for ct in cand_titles)
-        if title_hit:
-            score += 15
-            matching = [ct for ct in cand_titles if ct in job_title_lower]
+    # ── 4. Title relevance ──────────────────────────────────────────────
+    if criteria["title_lower"] and titles:
+        matching = _title_hits(titles, criteria)
+        if matching:
             reasons.append(f"Title match: {matching[0]}")
         else:
+            cand_titles = [t.lower() for t in titles]
             reasons.append(f"Title mismatch: candidate titles "
-                           f"[{', '.join(cand_titles[:3])}] not found in '{job.title}'")
-    elif not job_title_lower:
-        score += 15
-    else:
+                           f"[{', '.join(cand_titles[:3])}] not found in '{criteria['title']}'")
+    elif criteria["title_lower"]:
         reasons.append("Candidate has no titles on file")
 
-    # ── Final ───────────────────────────────────────────────────────────
-    score = min(round(score, 1), 100.0)
+    return reasons
 
-    if score >= 75:
-        fit_level = "high"
-    elif score >= 45:
-        fit_level = "medium"
-    else:
-        fit_level = "low"
 
-    return {"score": score, "match_reasons": reasons, "fit_level": fit_level}
+# ─── Batch scoring ──────────────────────────────────────────────────────────
+
+# Below this many candidates, process start-up and pickling cost more than
+# the scoring itself.
+_PARALLEL_MIN = 2000
+_SCORE_CHUNK = 256
+_SCORE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def _score_all(fields: list[tuple], criteria: dict) -> list[float]:
+    """
+    Numeric scores for every candidate tuple, fanning out to a process pool
+    for large runs.  Workers return bare floats; reasons are built by the
+    caller so no reason strings are pickled back.
+    """
+    score = functools.partial(_score_numeric, criteria=criteria)
+    if len(fields) < _PARALLEL_MIN or _SCORE_WORKERS < 2:
+        return [score(f) for f in fields]
+    try:
+        with ProcessPoolExecutor(max_workers=_SCORE_WORKERS) as pool:
+            return list(pool.map(score, fields, chunksize=_SCORE_CHUNK))
+    except (BrokenProcessPool, OSError):
+        logger.warning("Scoring pool unavailable — scoring in-process", exc_info=True)
+        return [score(f) for f in fields]
 
 
 # ─── Helpers ────────────────────────────────────────────────────────────────
@@ -121,13 +249,13 @@ def _candidate_to_dict(c: Candidate) -> dict:
         "email": c.email,
         "phone": c.phone,
         "location": c.location,
-        "titles": json.loads(c.titles) if c.titles else [],
-        "skills": json.loads(c.skills) if c.skills else [],
+        "titles": c.titles_list,
+        "skills": c.skills_list,
         "years_exp": c.years_exp,
         "raw_resume_path": c.raw_resume_path,
         "source_email_uid": c.source_email_uid,
         "notes": c.notes or "",
-        "tags": json.loads(c.tags) if c.tags else [],
+        "tags": c.tags_list,
         "created_at": c.created_at.isoformat() if c.created_at else None,
     }
 
@@ -147,7 +275,20 @@ def _job_to_dict(j: JobRequisition) -> dict:
 
 # ─── Public API ─────────────────────────────────────────────────────────────
 
-def run_match(job_id: int) -> list:
+def _could_be_high(fields: tuple, criteria: dict) -> bool:
+    """
+    Upper bound check: skill points plus every other category at full marks
+    (50 pts).  Fails for candidates whose skill overlap alone rules out
+    "high" fit, so they can be dropped before full scoring.
+    """
+    job_skills = criteria["skills"]
+    if not job_skills:
+        return True
+    skill_pts = round((fields[0].bit_count() / len(job_skills)) * 50, 1)
+    return skill_pts + 50 >= _HIGH_FIT_MIN
+
+
+def run_match(job_id: int, only_high: bool = False) -> list:
     """
     Match all candidates against a job requisition.
 
@@ -157,6 +298,9 @@ def run_match(job_id: int) -> list:
     - Returns a list sorted by score (descending), each entry containing
       candidate info, score, match_reasons, and fit_level.
 
+    With ``only_high``, only "high" fit candidates are kept; those whose
+    skill overlap already rules it out are skipped without being scored.
+
     Raises
     ------
     ValueError  if the job_id does not exist or there are no candidates.
@@ -172,19 +316,45 @@ def run_match(job_id: int) -> list:
             raise ValueError("No candidates in database")
 
         # Clear previous results for this job
-        db.query(MatchResult).filter(MatchResult.job_id == job_id).delete()
+        db.execute(delete(MatchResult).where(MatchResult.job_id == job_id))
+
+        # Skill overlap for every candidate in one indexed lookup
+        criteria = _job_criteria(job)
+        matched_by_cand: dict[int, int] = {}
+        if criteria["skills"]:
+            bits = criteria["skill_bits"]
+            hits = db.execute(
+                select(CandidateSkill.candidate_id, CandidateSkill.skill)
+                .where(CandidateSkill.skill.in_(criteria["skills"]))
+            )
+            for cand_id, skill in hits:
+                matched_by_cand[cand_id] = matched_by_cand.get(cand_id, 0) | bits[skill]
+
+        fields = [_candidate_fields(c, criteria, matched_by_cand.get(c.id, 0))
+                  for c in candidates]
+        if only_high:
+            kept = [i for i, f in enumerate(fields) if _could_be_high(f, criteria)]
+            candidates = [candidates[i] for i in kept]
+            fields = [fields[i] for i in kept]
+        scores = _score_all(fields, criteria)
 
         results = []
-        for c in candidates:
-            match = _score_candidate(c, job)
-            mr = MatchResult(
-                job_id=job_id,
-                candidate_id=c.id,
-                score=match["score"],
-                match_reasons=json.dumps(match["match_reasons"]),
-                fit_level=match["fit_level"],
-            )
-            db.add(mr)
+        rows = []
+        for c, f, score in zip(candidates, fields, scores):
+            if only_high and score < _HIGH_FIT_MIN:
+                continue
+            match = {
+                "score": score,
+                "match_reasons": _explain(f, criteria),
+                "fit_level": _fit_level(score),
+            }
+            rows.append({
+                "job_id": job_id,
+                "candidate_id": c.id,
+                "score": match["score"],
+                "match_reasons": orjson.dumps(match["match_reasons"]).decode(),
+                "fit_level": match["fit_level"],
+            })
             results.append({
                 "candidate": _candidate_to_dict(c),
                 "score": match["score"],
@@ -192,15 +362,16 @@ def run_match(job_id: int) -> list:
                 "fit_level": match["fit_level"],
             })
 
+        # One batched INSERT; RETURNING hands back the new match IDs directly
+        id_map = {}
+        if rows:
+            id_map = dict(
+                db.execute(
+                    insert(MatchResult).returning(MatchResult.candidate_id, MatchResult.id),
+                    rows,
+                ).all()
+            )
         db.commit()
-
-        # Back-fill match IDs from the newly persisted rows
-        saved = (
-            db.query(MatchResult)
-            .filter(MatchResult.job_id == job_id)
-            .all()
-        )
-        id_map = {mr.candidate_id: mr.id for mr in saved}
         for r in results:
             r["match_id"] = id_map.get(r["candidate"]["id"])
 
@@ -1,39 +1,238 @@
 """
 Resume / document parsing utilities.
 
-- extract_text_from_pdf(filepath)  – via pdfplumber
+- extract_text_from_pdf(filepath)  – via PyMuPDF (pdfplumber fallback)
 - extract_text_from_docx(filepath) – via python-docx
 - extract_entities(raw_text)       – regex + keyword matching (no external APIs)
+- text_digest(raw_text)            – blake2b key for caching extraction results
+- entity_cache_key(raw_text)       – the same, versioned by the entity rules
 - extract_name_from_subject(subject) – parse candidate name from forwarded email subjects
 """
 
+import functools
+import hashlib
+import io
+import logging
+import mmap
+import multiprocessing
+import os
 import re
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import pdfplumber
 from docx import Document as DocxDocument
 
+try:
+    import pymupdf
+except ImportError:  # pdfplumber-only install
+    pymupdf = None
 
-# ─── Text extraction ────────────────────────────────────────────────────────
+from database import USER_DATA_DIR
 
-def extract_text_from_pdf(filepath: str | Path) -> str:
-    """Extract all text from a PDF file using pdfplumber."""
-    pages = []
-    with pdfplumber.open(filepath) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if text:
-                pages.append(text)
-    return "\n".join(pages)
+try:
+    import ahocorasick
+except ImportError:  # optional accelerator — see _keyword_hits
+    ahocorasick = None
 
+logger = logging.getLogger(__name__)
 
-def extract_text_from_docx(filepath: str | Path) -> str:
-    """Extract all text from a DOCX file using python-docx."""
-    doc = DocxDocument(str(filepath))
+
+# ─── Text extraction ────────────────────────────────────────────────────────
+# Extracted text is cached by SHA-256 of the file bytes — in memory for hot
+# re-hits and on disk across restarts — so the same resume forwarded twice,
+# or re-processed, is only parsed once.
+
+_TEXT_CACHE_DIR = USER_DATA_DIR / "text_cache"
+# Part of every cache key — bump whenever extraction output for the same file
+# changes, so cached text from the old rules is never served again.
+_TEXT_RULES_VERSION = 2
+_TEXT_MEMO_SIZE = 64
+_text_memo: "OrderedDict[str, str]" = OrderedDict()
+_text_memo_lock = threading.Lock()
+
+
+# Files at or above this size are hashed through mmap and handed to the
+# parsers by path (MuPDF, python-docx) or as a mapping (pdfplumber), so the
+# bytes are never copied into a Python object.
+_MMAP_MIN_BYTES = 8 * 1024 * 1024
+
+
+def _file_digest(path: Path) -> tuple[str, bytes | Path]:
+    """SHA-256 of ``path`` plus the source to extract from (bytes, or the path if large)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            data = f.read()
+            return hashlib.sha256(data).hexdigest(), data
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest(), path
+
+
+@contextmanager
+def _open_source(source: bytes | Path):
+    """Seekable binary stream over ``source`` — memory-mapped when it is a path."""
+    if not isinstance(source, Path):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+
+def _cached_text(kind: str, filepath: str | Path, extract) -> str:
+    digest, source = _file_digest(Path(filepath))
+    key = f"{kind}-v{_TEXT_RULES_VERSION}-{digest}"
+    with _text_memo_lock:
+        text = _text_memo.get(key)
+        if text is not None:
+            _text_memo.move_to_end(key)
+            return text
+
+    cache_file = _TEXT_CACHE_DIR / f"{key}.txt"
+    try:
+        text = cache_file.read_text(encoding="utf-8", errors="surrogatepass")
+    except (OSError, UnicodeDecodeError):
+        text = extract(source)
+        try:
+            _TEXT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # A temp file of its own per writer — pool workers caching the
+            # same document must never share (and truncate) one
+            with tempfile.NamedTemporaryFile(
+                "w", dir=_TEXT_CACHE_DIR, prefix=f".{cache_file.name}.", suffix=".part",
+                encoding="utf-8", errors="surrogatepass", delete=False,
+            ) as tmp:
+                tmp.write(text)
+            try:
+                os.replace(tmp.name, cache_file)
+            except OSError:
+                os.unlink(tmp.name)
+                raise
+        except OSError:
+            pass  # cache is best-effort
+
+    with _text_memo_lock:
+        _text_memo[key] = text
+        if len(_text_memo) > _TEXT_MEMO_SIZE:
+            _text_memo.popitem(last=False)
+    return text
+
+
+# Long PDFs are split into page ranges across processes; resumes stay serial.
+_MIN_PAGES_FOR_PARALLEL = 32
+_PDF_PAGE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def _open_pdf(source: bytes | str | Path):
+    # MuPDF reads a path itself; it does not accept an mmap as a stream
+    if isinstance(source, (str, Path)):
+        return pymupdf.open(source, filetype="pdf")
+    return pymupdf.open(stream=source, filetype="pdf")
+
+
+def _pdf_page_range_text(source: bytes | str, start: int, stop: int) -> list[str]:
+    """Text of pages [start, stop) — runs in a worker process."""
+    with _open_pdf(source) as doc:
+        return [_pymupdf_page_text(doc, i) for i in range(start, stop)]
+
+
+def _parallel_pdf_pages(source: bytes | Path, page_count: int) -> list[str] | None:
+    """Page texts in order, or None if the pool could not run."""
+    step = -(-page_count // _PDF_PAGE_WORKERS)
+    # Large files go to the workers by path rather than pickled bytes
+    arg = str(source) if isinstance(source, Path) else source
+    try:
+        with ProcessPoolExecutor(max_workers=_PDF_PAGE_WORKERS) as pool:
+            futures = [
+                pool.submit(_pdf_page_range_text, arg, start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            ]
+            return [text for f in futures for text in f.result()]
+    except (BrokenProcessPool, OSError):
+        return None
+
+
+def _pdf_text(source: bytes | Path, max_pages: int | None = None) -> str:
+    if pymupdf is not None:
+        try:
+            with _open_pdf(source) as doc:
+                page_count = doc.page_count
+                if max_pages is not None and page_count > max_pages:
+                    logger.warning("PDF has %d pages — reading only the first %d", page_count, max_pages)
+                    page_count = max_pages
+                texts = None
+                # Not from inside a pipeline worker: no pools within pools
+                if (page_count >= _MIN_PAGES_FOR_PARALLEL and _PDF_PAGE_WORKERS > 1
+                        and multiprocessing.parent_process() is None):
+                    texts = _parallel_pdf_pages(source, page_count)
+                if texts is None:
+                    texts = _pymupdf_pages(doc, page_count)
+                text = "\n".join(t for t in texts if t)
+                # Blank despite fonts on some page (odd encodings, broken CMaps):
+                # let pdfminer have a go.  Font-less scans stay on the fast path.
+                if text.strip() or not any(
+                    doc.get_page_fonts(pno) for pno in range(page_count)
+                ):
+                    return text
+        except RuntimeError:  # FileDataError etc. — MuPDF rejected it, try pdfminer
+            pass
+    with _open_source(source) as stream:
+        return _pdfplumber_text(stream, max_pages)
+
+
+def _pymupdf_page_text(doc, pno: int) -> str:
+    # Scanned / image-only pages reference no fonts (form XObjects included),
+    # so there is nothing to extract — skip parsing their content streams.
+    if not doc.get_page_fonts(pno):
+        return ""
+    return doc[pno].get_text("text")
+
+
+def _pymupdf_pages(doc, stop: int | None = None):
+    for pno in range(doc.page_count if stop is None else stop):
+        yield _pymupdf_page_text(doc, pno)
+
+
+def _pdfplumber_pages(stream, max_pages: int | None = None):
+    with pdfplumber.open(stream) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield page.extract_text()
+            page.flush_cache()  # drop parsed layout objects once the text is out
+
+
+def _pdfplumber_text(stream, max_pages: int | None = None) -> str:
+    return "\n".join(t for t in _pdfplumber_pages(stream, max_pages) if t)
+
+
+def _docx_text(source: bytes | Path) -> str:
+    # zipfile needs .seekable(), which mmap lacks before 3.13; given a path it
+    # only reads the central directory and the members python-docx asks for.
+    doc = DocxDocument(str(source) if isinstance(source, Path) else io.BytesIO(source))
     paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
     return "\n".join(paragraphs)
 
 
+def extract_text_from_pdf(filepath: str | Path, max_pages: int | None = None) -> str:
+    """
+    Extract text from a PDF file using PyMuPDF (cached by content).
+
+    ``max_pages`` reads only the first N pages — a bound on how long one
+    oversized attachment can hold up ingest.
+    """
+    if max_pages is None:
+        return _cached_text("pdf", filepath, _pdf_text)
+    return _cached_text(f"pdf{max_pages}p", filepath, functools.partial(_pdf_text, max_pages=max_pages))
+
+
+def extract_text_from_docx(filepath: str | Path) -> str:
+    """Extract all text from a DOCX file using python-docx (cached by content)."""
+    return _cached_text("docx", filepath, _docx_text)
+
+
 # ─── Skill keywords (lowercase) ─────────────────────────────────────────────
 # Grouped by domain for readability; flattened into a set at module load.
 
@@ -110,15 +309,19 @@ SKILLS = sorted(
 
 # Pre-compile a regex for each skill.  Word boundaries work for most terms;
 # special-case entries that contain punctuation (e.g. "c++", "c#", "node.js").
-_SKILL_PATTERNS: list[tuple[str, re.Pattern]] = []
-for _skill in SKILLS:
-    if re.search(r'[+#./]', _skill):
+def _skill_pattern(skill: str) -> re.Pattern:
+    if re.search(r'[+#./]', skill):
         # Escape the literal and anchor with lookaround so "c++" doesn't need
         # a trailing word-boundary (which wouldn't match after '+').
-        _pat = re.compile(r'(?<![a-zA-Z])' + re.escape(_skill) + r'(?![a-zA-Z])', re.IGNORECASE)
-    else:
-        _pat = re.compile(r'\b' + re.escape(_skill) + r'\b', re.IGNORECASE)
-    _SKILL_PATTERNS.append((_skill, _pat))
+        return re.compile(r'(?<![a-zA-Z])' + re.escape(skill) + r'(?![a-zA-Z])', re.IGNORECASE)
+    return re.compile(r'\b' + re.escape(skill) + r'\b', re.IGNORECASE)
+
+
+# Immutable (canonical, pattern) table; canonical names are interned since the
+# same strings end up in every extracted profile.
+_SKILL_TABLE: tuple[tuple[str, re.Pattern], ...] = tuple(
+    (sys.intern(_skill), _skill_pattern(_skill)) for _skill in SKILLS
+)
 
 
 # ─── Title keywords ─────────────────────────────────────────────────────────
@@ -127,7 +330,7 @@ _TITLE_PATTERNS: list[re.Pattern] = [
     re.compile(p, re.IGNORECASE) for p in [
         # "Senior Software Engineer", "Lead Data Scientist", etc.
         r'\b(?:senior|junior|jr\.?|sr\.?|lead|principal|staff|chief|head of|vp of|director of|manager of|associate|intern)?'
-        r'\s*'
+        r'\s*+'
         r'(?:'
             r'software engineer(?:ing)?|software developer|web developer|'
             r'full[\s-]?stack (?:developer|engineer)|'
@@ -172,34 +375,42 @@ _TITLE_PATTERNS: list[re.Pattern] = [
 
 # ─── Years-of-experience patterns ───────────────────────────────────────────
 
+# Quantifiers are possessive (*+, ++) wherever the next token can't start with
+# what they consumed: same matches, but a digit followed by a long run of
+# spaces (common in PDF text) no longer backtracks through every split.
 _YOE_PATTERNS = [
     # "5+ years of experience", "10 yrs", "3-5 years", "over 8 years",
     # "more than 6 years", "15+ yrs of work"
     re.compile(
         r'(?:over\s+|more\s+than\s+)?'
-        r'(\d{1,2})\s*[\-–to]*\s*\d{0,2}\s*\+?\s*'
+        r'(\d{1,2})\s*+[\-–to]*+\s*+\d{0,2}+\s*+\+?+\s*+'
         r'(?:years?|yrs?|yr)\b'
         r'(?:\s+of\s+(?:experience|exp|work|professional))?',
         re.IGNORECASE,
     ),
     # "experience: 7 years"
     re.compile(
-        r'experience\s*(?::|\s)\s*(\d{1,2})\s*\+?\s*(?:years?|yrs?)',
+        r'experience(?:\s*+:|\s)\s*+(\d{1,2})\s*+\+?+\s*+(?:years?|yrs?)',
         re.IGNORECASE,
     ),
     # "X-year career" / "X year career"
     re.compile(
-        r'(\d{1,2})[\s-]*year\s+career',
+        r'(\d{1,2})[\s-]*+year\s++career',
         re.IGNORECASE,
     ),
     # "X years experience" (without "of")
     re.compile(
-        r'(\d{1,2})\s*\+?\s*(?:years?|yrs?)\s+experience',
+        r'(\d{1,2})\s*+\+?+\s*+(?:years?|yrs?)\s++experience',
         re.IGNORECASE,
     ),
 ]
 
 
+# Every years-of-experience and phone pattern needs a digit, so one scan for
+# any digit lets digit-free text skip all of them.
+_ANY_DIGIT_RE = re.compile(r'\d')
+
+
 # ─── Location patterns ──────────────────────────────────────────────────────
 
 _LOCATIONS = [
@@ -240,26 +451,62 @@ _US_STATES = [
 ]
 
 # Build patterns: longest first, word-boundary anchored
-_LOCATION_PATTERNS: list[tuple[str, re.Pattern]] = []
-for _loc in sorted(_LOCATIONS, key=len, reverse=True):
-    _LOCATION_PATTERNS.append((
-        _loc,
-        re.compile(r'\b' + re.escape(_loc) + r'\b', re.IGNORECASE),
-    ))
-# State codes: require ", XX" or "| XX" or " XX" after a city-like word context
-# and case-sensitive match
-for _st in _US_STATES:
-    _LOCATION_PATTERNS.append((
-        _st,
-        re.compile(r'(?:,\s*|\|\s*)' + _st + r'\b'),
-    ))
+_LOCATION_TABLE: tuple[tuple[str, re.Pattern], ...] = tuple(
+    (sys.intern(_loc), re.compile(r'\b' + re.escape(_loc) + r'\b', re.IGNORECASE))
+    for _loc in sorted(_LOCATIONS, key=len, reverse=True)
+)
+# State codes: one case-sensitive scan for ", XX" / "| XX", then a set lookup
+_US_STATES_SET = frozenset(_US_STATES)
+_STATE_RE = re.compile(r'[,|]\s*([A-Z]{2})\b')
+
+# ─── Keyword prefilter ──────────────────────────────────────────────────────
+# Finds every skill and named location that occurs anywhere in the case-folded
+# text as a plain substring; only those keywords then run their word-boundary
+# regex, so matching semantics are unchanged.  One Aho–Corasick pass when
+# pyahocorasick is installed, otherwise a C-level ``in`` test per keyword —
+# either way far cheaper than a regex search for the (common) misses.
+
+_SKILL_KEYS = tuple(c.casefold() for c, _ in _SKILL_TABLE)
+_LOCATION_KEYS = tuple(c.casefold() for c, _ in _LOCATION_TABLE)
+
+
+def _build_keyword_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    entries = [("skill", i, k) for i, k in enumerate(_SKILL_KEYS)]
+    entries += [("location", i, k) for i, k in enumerate(_LOCATION_KEYS)]
+    for kind, idx, key in entries:
+        automaton.add_word(key, automaton.get(key, ()) + ((kind, idx),))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _keyword_hits(raw_text: str) -> tuple[set[int], set[int]]:
+    """Indices into _SKILL_TABLE / _LOCATION_TABLE whose keyword appears in ``raw_text``."""
+    folded = raw_text.casefold()
+    if _KEYWORD_AUTOMATON is None:
+        return (
+            {i for i, k in enumerate(_SKILL_KEYS) if k in folded},
+            {i for i, k in enumerate(_LOCATION_KEYS) if k in folded},
+        )
+    hits = {"skill": set(), "location": set()}
+    for _end, keys in _KEYWORD_AUTOMATON.iter(folded):
+        for kind, idx in keys:
+            hits[kind].add(idx)
+    return hits["skill"], hits["location"]
+
 
 # "City, ST" / "City ST" pattern — captures the full "City, ST" or "City ST" pair
-# for US locations not in the named list
+# for US locations not in the named list.  The state codes are part of the
+# pattern, so non-state pairs ("Main St NW") never produce a match.
 _CITY_STATE_RE = re.compile(
     r'\b([A-Z][a-z]+(?:\s[A-Z][a-z]+)?)'     # City (1-2 capitalized words)
     r'[,\s]\s*'                                # comma or space separator
-    r'([A-Z]{2})\b'                            # 2-letter state code
+    r'(' + '|'.join(_US_STATES) + r')\b'        # 2-letter state code
 )
 
 
@@ -270,6 +517,9 @@ _CITY_STATE_RE = re.compile(
 #   "Re: Candidate - Jane Smith - Software Engineer"
 #   "Fwd: ABC Corp Candidate - John Doe - Data Analyst - REQ #12345"
 
+# Leading "Fw:" / "Fwd:" / "Re:" (repeated) stripped before matching
+_SUBJ_PREFIX_RE = re.compile(r'^(?:(?:Fw|Fwd|Re)\s*:\s*)+', re.IGNORECASE)
+
 _SUBJECT_NAME_PATTERNS = [
     # "Candidate - FirstName [M.] LastName - Title"
     re.compile(
@@ -317,7 +567,7 @@ def extract_name_from_subject(subject: str) -> str | None:
         return None
 
     # Strip common Fw/Fwd/Re prefixes
-    cleaned = re.sub(r'^(?:(?:Fw|Fwd|Re)\s*:\s*)+', '', subject, flags=re.IGNORECASE).strip()
+    cleaned = _SUBJ_PREFIX_RE.sub('', subject).strip()
 
     for pat in _SUBJECT_NAME_PATTERNS:
         m = pat.search(cleaned)
@@ -342,7 +592,7 @@ def extract_title_from_subject(subject: str) -> str | None:
     if not subject:
         return None
 
-    cleaned = re.sub(r'^(?:(?:Fw|Fwd|Re)\s*:\s*)+', '', subject, flags=re.IGNORECASE).strip()
+    cleaned = _SUBJ_PREFIX_RE.sub('', subject).strip()
 
     for pat in _SUBJECT_TITLE_PATTERNS:
         m = pat.search(cleaned)
@@ -356,27 +606,80 @@ def extract_title_from_subject(subject: str) -> str | None:
 
 # ─── Phone patterns (for resume text) ───────────────────────────────────────
 
-_PHONE_PATTERNS = [
+# One alternation, so a single scan finds the first phone number in the text;
+# at any position the more specific formats are tried first.
+_PHONE_RE = re.compile(
     # +91-XXXXXXXXXX or +91 XXXXXXXXXX (Indian format)
-    re.compile(r'\+91[\s\-.]?\d{5}[\s\-.]?\d{5}\b'),
+    r'\+91[\s\-.]?\d{5}[\s\-.]?\d{5}\b'
     # +1 (555) 123-4567, (555) 123-4567, 555-123-4567 (US/Canada)
-    re.compile(
-        r'(?:\+1[\s\-.]?)?'
-        r'\(?\d{3}\)?[\s\-.]?'
-        r'\d{3}[\s\-.]?\d{4}\b'
-    ),
+    r'|(?:\+1[\s\-.]?)?'
+    r'\(?\d{3}\)?[\s\-.]?'
+    r'\d{3}[\s\-.]?\d{4}\b'
     # +44 20 7946 0958 (UK / international)
-    re.compile(
-        r'\+\d{1,3}[\s\-.]?'
-        r'\d{2,4}[\s\-.]?'
-        r'\d{3,4}[\s\-.]?\d{3,4}\b'
-    ),
-]
+    r'|\+\d{1,3}[\s\-.]?'
+    r'\d{2,4}[\s\-.]?'
+    r'\d{3,4}[\s\-.]?\d{3,4}\b'
+)
 
 
 # ─── Entity extraction ──────────────────────────────────────────────────────
 
+# Recent extraction results keyed by text digest (re-previewed JDs, retried scrapes)
+_ENTITY_CACHE_SIZE = 128
+
+# Mixed into entity_cache_key() — bump whenever extract_entities() can return
+# something different for the same text (new patterns, changed tie-breaks).
+_ENTITY_RULES_VERSION = 2
+_entity_cache: "OrderedDict[str, dict]" = OrderedDict()
+_entity_cache_lock = threading.Lock()
+
+# Very long documents (portfolios, publication lists) are scanned as head +
+# tail only: contact details, skills and the career summary sit at the ends,
+# the middle is mostly prose.
+_MAX_SCAN_CHARS = 100_000
+_SCAN_HEAD_CHARS = 60_000
+_SCAN_TAIL_CHARS = 20_000
+
+
+def text_digest(raw_text: str) -> str:
+    """Stable 128-bit digest of a document's text."""
+    return hashlib.blake2b(raw_text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def entity_cache_key(raw_text: str) -> str:
+    """:func:`text_digest` specific to the current ``_ENTITY_RULES_VERSION``."""
+    return hashlib.blake2b(
+        raw_text.encode("utf-8", "surrogatepass"), digest_size=16,
+        person=f"entities-v{_ENTITY_RULES_VERSION}".encode(),
+    ).hexdigest()
+
+
+def copy_entities(entities: dict) -> dict:
+    """Copy an entities dict deep enough that callers may mutate its lists."""
+    return {k: list(v) if isinstance(v, list) else v for k, v in entities.items()}
+
+
 def extract_entities(raw_text: str) -> dict:
+    """
+    Memoized :func:`_extract_entities` — returns a fresh copy on every call.
+    """
+    if not raw_text:
+        return _extract_entities(raw_text)
+    key = text_digest(raw_text)
+    with _entity_cache_lock:
+        cached = _entity_cache.get(key)
+        if cached is not None:
+            _entity_cache.move_to_end(key)
+            return copy_entities(cached)
+    result = _extract_entities(raw_text)
+    with _entity_cache_lock:
+        _entity_cache[key] = copy_entities(result)
+        if len(_entity_cache) > _ENTITY_CACHE_SIZE:
+            _entity_cache.popitem(last=False)
+    return result
+
+
+def _extract_entities(raw_text: str) -> dict:
     """
     Extract structured fields from raw resume / JD text.
 
@@ -393,19 +696,32 @@ def extract_entities(raw_text: str) -> dict:
     if not raw_text:
         return {"skills": [], "years_exp": None, "titles": [], "locations": [], "phone": None, "name": None}
 
+    if len(raw_text) > _MAX_SCAN_CHARS:
+        logger.info(
+            "Scanning first %d and last %d of %d characters for entities",
+            _SCAN_HEAD_CHARS, _SCAN_TAIL_CHARS, len(raw_text),
+        )
+        raw_text = raw_text[:_SCAN_HEAD_CHARS] + "\n" + raw_text[-_SCAN_TAIL_CHARS:]
+
+    skill_hits, location_hits = _keyword_hits(raw_text)
+
     # --- Skills ---
     found_skills: list[str] = []
     seen_skills: set[str] = set()
-    for canonical, pat in _SKILL_PATTERNS:
+    table = _SKILL_TABLE
+    for i in sorted(skill_hits):
+        canonical, pat = table[i]
         if pat.search(raw_text):
             key = canonical.lower()
             if key not in seen_skills:
                 seen_skills.add(key)
                 found_skills.append(canonical)
 
+    has_digits = _ANY_DIGIT_RE.search(raw_text) is not None
+
     # --- Years of experience ---
     years_exp: int | None = None
-    for pat in _YOE_PATTERNS:
+    for pat in (_YOE_PATTERNS if has_digits else ()):
         m = pat.search(raw_text)
         if m:
             try:
@@ -429,42 +745,48 @@ def extract_entities(raw_text: str) -> dict:
     # --- Locations ---
     found_locations: list[str] = []
     seen_locations: set[str] = set()
-    for canonical, pat in _LOCATION_PATTERNS:
+    table = _LOCATION_TABLE
+    for i in sorted(location_hits):
+        canonical, pat = table[i]
         if pat.search(raw_text):
             key = canonical.lower()
             if key not in seen_locations:
                 seen_locations.add(key)
                 found_locations.append(canonical)
 
-    # Also try the generic "City, ST" / "City ST" pattern
-    for m in _CITY_STATE_RE.finditer(raw_text):
-        city = m.group(1)
-        state = m.group(2)
-        if state in _US_STATES:
-            loc_str = f"{city}, {state}"
-            key = loc_str.lower()
+    states_found = {m.group(1) for m in _STATE_RE.finditer(raw_text)} & _US_STATES_SET
+    for st in _US_STATES:
+        if st in states_found:
+            key = st.lower()
             if key not in seen_locations:
                 seen_locations.add(key)
-                # Remove bare city or bare state if "City, ST" is more specific
-                city_key = city.lower()
-                state_key = state.lower()
-                for bare in (city_key, state_key):
-                    if bare in seen_locations:
-                        found_locations = [l for l in found_locations if l.lower() != bare]
-                        seen_locations.discard(bare)
-                seen_locations.add(key)
-                found_locations.append(loc_str)
+                found_locations.append(st)
+
+    # Also try the generic "City, ST" / "City ST" pattern
+    for m in _CITY_STATE_RE.finditer(raw_text):
+        city, state = m.group(1), m.group(2)
+        loc_str = f"{city}, {state}"
+        key = loc_str.lower()
+        if key not in seen_locations:
+            seen_locations.add(key)
+            # Remove bare city or bare state if "City, ST" is more specific
+            city_key = city.lower()
+            state_key = state.lower()
+            for bare in (city_key, state_key):
+                if bare in seen_locations:
+                    found_locations = [l for l in found_locations if l.lower() != bare]
+                    seen_locations.discard(bare)
+            seen_locations.add(key)
+            found_locations.append(loc_str)
 
     # --- Phone ---
     phone: str | None = None
-    for pat in _PHONE_PATTERNS:
-        m = pat.search(raw_text)
-        if m:
-            raw = m.group(0).strip()
-            digits = re.sub(r'\D', '', raw)
-            if len(digits) >= 7:
-                phone = raw
-                break
+    m = _PHONE_RE.search(raw_text) if has_digits else None
+    if m:
+        raw = m.group(0).strip()
+        digits = re.sub(r'\D', '', raw)
+        if len(digits) >= 7:
+            phone = raw
 
     return {
         "skills": found_skills,
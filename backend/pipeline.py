@@ -5,21 +5,59 @@ Takes an attachment file + email context, runs the full extraction chain,
 deduplicates, and persists the candidate to SQLite.
 """
 
-import json
 import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
-from database import SessionLocal, Candidate, JobRequisition, Notification, create_tables
+import orjson
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import (
+    SessionLocal, Candidate, CandidateSkill, Notification, ensure_tables,
+    normalize_name, email_domain, candidate_skill_rows, job_skill_index,
+)
 from parsers import (
-    extract_text_from_pdf, extract_text_from_docx, extract_entities,
+    extract_text_from_pdf, extract_text_from_docx,
     extract_name_from_subject, extract_title_from_subject,
 )
-from extractors import extract_email_metadata, merge_profile, find_existing_candidate
+from extractors import (
+    extract_email_metadata, merge_profile, find_existing_candidate, find_existing_emails,
+    lookup_cached_entities, store_cached_entities,
+)
 
 logger = logging.getLogger(__name__)
 
 _SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".doc"}
 
+# Résumés run a few pages; anything past this is appendices or a scan dump
+_MAX_RESUME_PAGES = 8
+
+# Worker processes for text/entity extraction (steps 1–5).  Persistence always
+# stays in the calling process so SQLite only ever sees one writer.
+_EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+_extract_pool: ProcessPoolExecutor | None = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=_EXTRACT_WORKERS)
+        return _extract_pool
+
+
+def _reset_extract_pool() -> None:
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is not None:
+            _extract_pool.shutdown(wait=False, cancel_futures=True)
+        _extract_pool = None
+
 
 def process_attachment_into_candidate(
     attachment_filepath: str,
@@ -50,8 +88,99 @@ def process_attachment_into_candidate(
     dict  – the saved candidate record (with ``id``), or
     None  – if the candidate is a duplicate or the file is unsupported.
     """
-    create_tables()
+    return process_attachments_into_candidates([dict(
+        attachment_filepath=attachment_filepath, email_uid=email_uid,
+        email_body=email_body, email_sender=email_sender, email_subject=email_subject,
+    )])[0]
+
+
+def process_attachments_into_candidates(jobs: list[dict]) -> list[dict | None]:
+    """
+    Run the pipeline for several attachments at once.
+
+    Each job holds the keyword arguments of
+    :func:`process_attachment_into_candidate`.  Extraction fans out to a
+    process pool; dedup + persistence then run here, in job order, so a
+    candidate seen twice in one batch is still caught as a duplicate.
+    Returns one result per job (``None`` for skipped or failed ones).
+    """
+    if not jobs:
+        return []
+    ensure_tables()
+
+    if len(jobs) == 1:
+        profiles = [_extract_safely(jobs[0])]
+    else:
+        try:
+            profiles = list(_get_extract_pool().map(_extract_safely, jobs, chunksize=4))
+        except BrokenProcessPool:
+            logger.exception("Extraction worker died — finishing batch in-process")
+            _reset_extract_pool()
+            profiles = [_extract_safely(job) for job in jobs]
+
+    # One dedup query for the whole batch; save_candidate_profile adds each
+    # new email so a repeat later in the batch is still caught.
+    try:
+        known_emails = find_existing_emails(p.get("email") for p in profiles if p)
+    except Exception:
+        logger.exception("Batch dedup lookup failed — checking candidates one by one")
+        known_emails = None
+
+    # Entity-cache misses come back from the workers and are written here
+    cache_rows = [p.pop("entity_cache_row") for p in profiles if p and p.get("entity_cache_row")]
+
+    # One session (and connection) for all writes; each candidate still
+    # commits on its own so one bad row can't roll back the rest.
+    results = []
+    db = SessionLocal()
+    try:
+        if cache_rows:
+            try:
+                store_cached_entities(db, cache_rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception("Failed to cache extracted entities")
+            db.expunge_all()
+
+        for job, profile in zip(jobs, profiles):
+            if profile is None:
+                results.append(None)
+                continue
+            try:
+                results.append(save_candidate_profile(profile, known_emails, db=db))
+            except Exception:
+                logger.exception("Candidate pipeline failed for %s", job.get("attachment_filepath"))
+                results.append(None)
+            db.expunge_all()
+    finally:
+        db.close()
+    return results
 
+
+def _extract_safely(job: dict) -> dict | None:
+    """Pool task wrapper: one bad file must not fail the whole batch."""
+    try:
+        return extract_candidate_profile(**job)
+    except Exception:
+        logger.exception("Candidate extraction failed for %s", job.get("attachment_filepath"))
+        return None
+
+
+def extract_candidate_profile(
+    attachment_filepath: str,
+    email_uid: str,
+    email_body: str,
+    email_sender: str,
+    email_subject: str = "",
+) -> dict | None:
+    """
+    Steps 1–5 of the pipeline: parse the file and email into a merged
+    profile.  Only reads the database (the entity cache), so it is safe to
+    run in a worker process; a cache miss is returned as the profile's
+    ``entity_cache_row`` for the caller to store.
+    Returns ``None`` if the file is unsupported/missing or the merge fails.
+    """
     filepath = Path(attachment_filepath)
 
     # ── 1. Validate file ─────────────────────────────────────────────────
@@ -60,29 +189,33 @@ def process_attachment_into_candidate(
         logger.info("Skipping unsupported file type: %s", ext)
         return None
 
-    if not filepath.exists():
-        logger.error("Attachment file not found: %s", filepath)
-        return None
-
     # ── 2. Extract text from document ────────────────────────────────────
+    # No separate exists() check: the extractor's own open() reports a
+    # missing file, without a second stat or a gap for it to vanish in.
     raw_text = ""
     try:
         if ext == ".pdf":
-            raw_text = extract_text_from_pdf(filepath)
+            raw_text = extract_text_from_pdf(filepath, max_pages=_MAX_RESUME_PAGES)
         elif ext in (".docx", ".doc"):
             raw_text = extract_text_from_docx(filepath)
+    except FileNotFoundError:
+        logger.error("Attachment file not found: %s", filepath)
+        return None
     except Exception:
         logger.exception("Failed to extract text from %s", filepath)
 
+    # ── 3. Extract entities from resume text ─────────────────────────────
+    # Blank text (scans, empty files) can't match anything — skip the entity
+    # cache lookup and the pattern scans.
+    resume_data = {"skills": [], "years_exp": None, "titles": [], "locations": []}
+    entity_cache_row = None
     if not raw_text.strip():
         logger.warning("No text extracted from %s", filepath)
-
-    # ── 3. Extract entities from resume text ─────────────────────────────
-    try:
-        resume_data = extract_entities(raw_text)
-    except Exception:
-        logger.exception("Entity extraction failed for %s", filepath)
-        resume_data = {"skills": [], "years_exp": None, "titles": [], "locations": []}
+    else:
+        try:
+            resume_data, entity_cache_row = lookup_cached_entities(raw_text)
+        except Exception:
+            logger.exception("Entity extraction failed for %s", filepath)
 
     # Attach file-level metadata the merge step expects
     resume_data["raw_resume_path"] = str(filepath)
@@ -91,7 +224,7 @@ def process_attachment_into_candidate(
     # ── 4. Extract metadata from the email body ──────────────────────────
     try:
         email_data = extract_email_metadata(email_body or "")
-    except Exception:
+    except (AttributeError, TypeError):  # non-str body from a malformed message
         logger.exception("Email metadata extraction failed")
         email_data = {
             "name": None, "email": None, "phone": None,
@@ -120,16 +253,38 @@ def process_attachment_into_candidate(
     except Exception:
         logger.exception("Profile merge failed")
         return None
+    if entity_cache_row is not None:
+        profile["entity_cache_row"] = entity_cache_row
+    return profile
+
+
+def save_candidate_profile(
+    profile: dict,
+    known_emails: dict[str, int] | None = None,
+    db: Session | None = None,
+) -> dict | None:
+    """
+    Steps 6–7 of the pipeline: dedupe by email and persist the candidate
+    (plus notifications).  Returns the saved record, or ``None`` for a
+    duplicate or a failed write.
 
+    ``known_emails`` is a pre-fetched ``{lower-cased email: candidate id}``
+    map (see :func:`find_existing_emails`) used instead of a per-candidate
+    query; the saved candidate's email is added to it.  ``db`` lets a batch
+    reuse one session; it is committed but left open.
+    """
     # ── 6. Deduplicate by email address ──────────────────────────────────
     candidate_email = profile.get("email")
     if candidate_email:
         try:
-            existing = find_existing_candidate(candidate_email)
-            if existing:
+            if known_emails is not None:
+                existing_id = known_emails.get(candidate_email.strip().lower())
+            else:
+                existing_id = find_existing_candidate(candidate_email)
+            if existing_id is not None:
                 logger.info(
                     "Duplicate candidate (id=%s, email=%s) — skipping",
-                    existing.id, candidate_email,
+                    existing_id, candidate_email,
                 )
                 return None
         except Exception:
@@ -138,78 +293,103 @@ def process_attachment_into_candidate(
     # ── 7. Persist to database ───────────────────────────────────────────
     # Candidate.name is NOT NULL — derive a fallback if parsing found nothing
     name = profile.get("name") or _name_from_email(candidate_email) or "Unknown"
+    # Serialize once; the decoded lists are reused below instead of re-parsing
+    # the stored JSON for notifications and the return value.
+    titles = list(profile.get("titles") or [])
+    skills = list(profile.get("skills") or [])
 
     candidate = Candidate(
         name=name,
         email=candidate_email,
         phone=profile.get("phone"),
         location=profile.get("location"),
-        titles=json.dumps(profile.get("titles", [])),
-        skills=json.dumps(profile.get("skills", [])),
+        titles=orjson.dumps(titles).decode(),
+        skills=orjson.dumps(skills).decode(),
         years_exp=profile.get("years_exp"),
         raw_resume_path=profile.get("raw_resume_path"),
         source_email_uid=profile.get("source_email_uid"),
+        name_normalized=normalize_name(name),
+        email_domain=email_domain(candidate_email),
     )
 
-    db = SessionLocal()
+    # High-fit notifications are worked out before the write so candidate,
+    # skills and notifications go to disk in one transaction (one commit).
+    high_fit = []
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
     try:
+        if skills:
+            try:
+                skill_bits, jobs = job_skill_index(db)
+                cand_mask = 0
+                for s in skills:
+                    cand_mask |= skill_bits.get(s.lower(), 0)
+                for job_id, job_title, job_mask, job_skill_count in (jobs if cand_mask else ()):
+                    overlap = (cand_mask & job_mask).bit_count()
+                    score = round((overlap / job_skill_count) * 100)
+                    if score >= 75:
+                        high_fit.append((job_id, f"{name} matches {job_title} ({score}%)"))
+            except Exception:
+                logger.exception("High-fit check failed for %s", candidate_email or name)
+                high_fit = []
+
         db.add(candidate)
-        db.commit()
-        db.refresh(candidate)
-        logger.info("Saved candidate id=%s name=%s", candidate.id, candidate.name)
+        db.flush()
+        skill_rows = candidate_skill_rows(candidate.id, skills)
+        if skill_rows:
+            db.execute(insert(CandidateSkill), skill_rows)
 
         # ── Notifications ─────────────────────────────────────────────
-        # Always create a "new_candidate" notification
-        try:
-            db.add(Notification(
-                type="new_candidate",
-                title="New Candidate",
-                message=f"{candidate.name} added from email",
-                candidate_id=candidate.id,
-            ))
-
-            # Quick skill match against all jobs
-            cand_skills = {s.lower() for s in json.loads(candidate.skills or "[]")}
-            if cand_skills:
-                jobs = db.query(JobRequisition).all()
-                for job in jobs:
-                    job_skills = {s.lower() for s in json.loads(job.required_skills or "[]")}
-                    if not job_skills:
-                        continue
-                    overlap = len(cand_skills & job_skills)
-                    score = round((overlap / len(job_skills)) * 100)
-                    if score >= 75:
-                        db.add(Notification(
-                            type="new_high_fit",
-                            title="High-Fit Match",
-                            message=f"{candidate.name} matches {job.title} ({score}%)",
-                            candidate_id=candidate.id,
-                            job_id=job.id,
-                        ))
-
-            db.commit()
-        except Exception:
-            logger.exception("Failed to create notifications for candidate %s", candidate.id)
+        # Always a "new_candidate" one, plus one per high-fit job — a single
+        # executemany instead of a flush per ORM object
+        db.execute(insert(Notification), [
+            {
+                "type": "new_candidate",
+                "title": "New Candidate",
+                "message": f"{name} added from email",
+                "candidate_id": candidate.id,
+                "job_id": None,
+            },
+            *(
+                {
+                    "type": "new_high_fit",
+                    "title": "High-Fit Match",
+                    "message": message,
+                    "candidate_id": candidate.id,
+                    "job_id": job_id,
+                }
+                for job_id, message in high_fit
+            ),
+        ])
 
-        return {
+        # Built from the flushed object before commit expires it, so no
+        # refresh SELECT is needed afterwards
+        record = {
             "id": candidate.id,
             "name": candidate.name,
             "email": candidate.email,
             "phone": candidate.phone,
             "location": candidate.location,
-            "titles": json.loads(candidate.titles or "[]"),
-            "skills": json.loads(candidate.skills or "[]"),
+            "titles": titles,
+            "skills": skills,
             "years_exp": candidate.years_exp,
             "raw_resume_path": candidate.raw_resume_path,
             "source_email_uid": candidate.source_email_uid,
             "created_at": candidate.created_at.isoformat() if candidate.created_at else None,
         }
+        db.commit()
+        logger.info("Saved candidate id=%s name=%s", record["id"], record["name"])
+        if known_emails is not None and candidate_email:
+            known_emails[candidate_email.strip().lower()] = record["id"]
+        return record
     except Exception:
         db.rollback()
         logger.exception("Failed to save candidate to database")
         return None
     finally:
-        db.close()
+        if own_session:
+            db.close()
 
 
 def _name_from_email(addr: str | None) -> str | None:
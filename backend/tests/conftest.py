@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Keep the app's data dir (DB, .env, attachments) out of the real profile
+_DATA_HOME = tempfile.mkdtemp(prefix="mailscraper-tests-")
+os.environ["HOME"] = _DATA_HOME
+os.environ["APPDATA"] = _DATA_HOME
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
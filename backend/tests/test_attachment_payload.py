@@ -0,0 +1,78 @@
+import base64
+import email
+import email.message
+from email.message import EmailMessage
+
+import pytest
+
+from main import ATTACHMENTS_DIR, _iter_part_payload, _save_attachment_with_metadata, _walk_once
+
+
+def _base64_part(body: str) -> email.message.Message:
+    part = email.message.Message()
+    part["Content-Transfer-Encoding"] = "base64"
+    part.set_payload(body)
+    return part
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+def test_clean_base64_matches_email_package(chunk_size):
+    data = bytes(range(256)) * 20
+    part = _base64_part(base64.encodebytes(data).decode())
+    assert b"".join(_iter_part_payload(part, chunk_size)) == data
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+@pytest.mark.parametrize("junk_at", [0, 100, 3000, -3])
+def test_malformed_base64_is_not_duplicated(chunk_size, junk_at):
+    data = bytes(range(256)) * 20
+    encoded = base64.encodebytes(data).decode()
+    part = _base64_part(encoded[:junk_at] + "!" + encoded[junk_at:])
+    expected = part.get_payload(decode=True)
+    assert len(expected) == len(data)
+    assert b"".join(_iter_part_payload(part, chunk_size)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [3, 64])
+@pytest.mark.parametrize("body", [
+    "QUJD\nRA",       # padding missing
+    "QUJD=REVG",      # "=" inside a group is ignored
+    "QQ==QUJD",       # "=" completing a group ends the data
+    "QU=A=QUJD",
+])
+def test_stray_padding_matches_email_package(chunk_size, body):
+    part = _base64_part(body)
+    assert b"".join(_iter_part_payload(part, chunk_size)) == part.get_payload(decode=True)
+
+
+def test_scrape_walk_leaves_attachments_undecoded(monkeypatch):
+    msg = EmailMessage()
+    msg.set_content("Please find my CV attached.")
+    msg.add_attachment(b"%PDF" * 5000, maintype="application", subtype="pdf", filename="cv.pdf")
+    msg = email.message_from_bytes(msg.as_bytes())
+
+    decoded = []
+    real_get_payload = email.message.Message.get_payload
+
+    def get_payload(self, i=None, decode=False):
+        if decode:
+            decoded.append(self.get_content_type())
+        return real_get_payload(self, i, decode)
+
+    monkeypatch.setattr(email.message.Message, "get_payload", get_payload)
+    text_body, _, atts = _walk_once(msg, attachment_sizes=False)
+
+    assert text_body.strip() == "Please find my CV attached."
+    assert decoded == ["text/plain"]
+    assert [a["name"] for a in atts] == ["cv.pdf"]
+
+
+def test_saving_reports_bytes_written():
+    data = b"%PDF" * 5000
+    part = _base64_part(base64.encodebytes(data).decode())
+    filename, size = _save_attachment_with_metadata(
+        content=_iter_part_payload(part, 64), uid=1, index=0,
+        original_name="cv.pdf", content_type="application/pdf",
+    )
+    assert size == len(data)
+    assert (ATTACHMENTS_DIR / filename).read_bytes() == data
@@ -0,0 +1,57 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Response
+
+import main
+from database import Candidate, SessionLocal, email_domain, ensure_tables, normalize_name
+
+_FIRST = ["alice", "bob", "carol", "dan", "erin"]
+_LAST = ["smith", "jones", "lee"]
+_DOMAINS = ["gmail.com", "acme.io", "corp.net"]
+
+
+@pytest.fixture
+def candidates():
+    ensure_tables()
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db = SessionLocal()
+    try:
+        db.query(Candidate).delete()
+        for i in range(120):
+            words = rng.sample(_FIRST, 1) + rng.sample(_LAST, rng.randint(0, 2))
+            name = " ".join(w.title() for w in words)
+            addr = f"{words[0]}{rng.randint(0, 40)}@{rng.choice(_DOMAINS)}"
+            db.add(Candidate(
+                name=name, email=addr, created_at=start + timedelta(hours=i),
+                name_normalized=normalize_name(name), email_domain=email_domain(addr),
+            ))
+        db.commit()
+        yield
+        db.query(Candidate).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _flags(rows):
+    return {r["id"]: (r["is_duplicate"], r["duplicate_group_id"]) for r in rows}
+
+
+@pytest.mark.parametrize("limit", [1, 7, 50])
+def test_pages_agree_with_full_listing(candidates, limit):
+    full = _flags(asyncio.run(main.list_candidates(Response())))
+
+    paged, cursor = {}, None
+    while True:
+        response = Response()
+        page = asyncio.run(main.list_candidates(response, limit=limit, cursor=cursor))
+        paged.update(_flags(page))
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert paged == full
@@ -0,0 +1,37 @@
+import base64
+
+import main
+
+
+def test_same_named_attachments_get_distinct_files(monkeypatch):
+    # Graph IDs share a long store prefix; only the tail tells messages apart
+    msg_ids = [f"AAMkAGI2TG93AAA=_{i:03d}" for i in range(30)]
+
+    def get_message(msg_id):
+        return {
+            "id": msg_id, "subject": "Application", "sender_email": "a@example.com",
+            "body_text": "", "attachments": [
+                {"id": "inline", "name": "CV.pdf", "content_type": "application/pdf",
+                 "content_bytes": base64.b64encode(f"inline {msg_id}".encode()).decode()},
+                {"id": "large", "name": "CV.pdf", "content_type": "application/pdf",
+                 "content_bytes": None},
+            ],
+        }
+
+    monkeypatch.setattr(main.graph_client, "list_messages",
+                        lambda folder, query: {"messages": [{"id": m} for m in msg_ids]})
+    monkeypatch.setattr(main.graph_client, "get_message", get_message)
+    monkeypatch.setattr(main.graph_client, "download_attachments",
+                        lambda pairs: {p: f"large {p[0]}".encode() for p in pairs})
+    queued = []
+    monkeypatch.setattr(main, "process_attachments_into_candidates",
+                        lambda jobs: queued.extend(jobs) or [])
+
+    emails = main._scrape_via_graph(folder_id="inbox")
+
+    paths = [job["attachment_filepath"] for job in queued]
+    assert len(paths) == len(set(paths)) == 2 * len(msg_ids)
+    for em in emails:
+        inline, large = em.attachments
+        assert (main.ATTACHMENTS_DIR / inline.filename).read_bytes() == f"inline {em.id}".encode()
+        assert (main.ATTACHMENTS_DIR / large.filename).read_bytes() == f"large {em.id}".encode()
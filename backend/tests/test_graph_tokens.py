@@ -0,0 +1,46 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import graph_client
+
+
+class _TokenResponse:
+    def __init__(self, n):
+        self.n = n
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"access_token": f"new-{self.n}", "expires_in": 3600}
+
+
+def test_concurrent_callers_share_one_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_client, "SESSION_FILE", tmp_path / ".session.json")
+    monkeypatch.setenv("MICROSOFT_CLIENT_ID", "client")
+    graph_client.save_tokens({
+        "access_token": "old", "refresh_token": "refresh",
+        "access_token_expires_at": (datetime.utcnow() - timedelta(hours=1)).isoformat(),
+    })
+
+    posts = []
+
+    def post(*args, **kwargs):
+        posts.append(1)
+        time.sleep(0.05)
+        return _TokenResponse(len(posts))
+
+    monkeypatch.setattr(graph_client.HTTP_SESSION, "post", post)
+
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(graph_client.get_valid_token()))
+               for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(posts) == 1
+    assert tokens == ["new-1"] * 12
+    assert [p.name for p in tmp_path.iterdir()] == [".session.json"]
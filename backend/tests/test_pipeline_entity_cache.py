@@ -0,0 +1,65 @@
+import logging
+
+import pymupdf
+import pytest
+
+import pipeline
+from database import Candidate, EntityCache, SessionLocal, ensure_tables
+from parsers import entity_cache_key
+
+_RESUMES = [
+    ("Jane Roe", "jane.roe@example.com", "Senior Python developer, 6 years of experience. Django, AWS, Docker."),
+    ("John Poe", "john.poe@example.org", "Data engineer with 4 years experience in Spark, SQL and Airflow."),
+]
+
+
+@pytest.fixture
+def resume_jobs(tmp_path):
+    ensure_tables()
+    db = SessionLocal()
+    db.query(Candidate).delete()
+    db.query(EntityCache).delete()
+    db.commit()
+    db.close()
+
+    jobs = []
+    for name, addr, body in _RESUMES:
+        path = tmp_path / f"{name.split()[0]}.pdf"
+        doc = pymupdf.open()
+        doc.new_page().insert_text((72, 72), f"{name}\n{addr}\n{body}")
+        doc.save(path)
+        doc.close()
+        jobs.append(dict(
+            attachment_filepath=str(path), email_uid=name,
+            email_body="", email_sender=addr, email_subject=f"Application - {name}",
+        ))
+    return jobs
+
+
+def test_batch_writes_entity_cache_from_the_parent(resume_jobs, caplog):
+    with caplog.at_level(logging.ERROR):
+        saved = pipeline.process_attachments_into_candidates(resume_jobs)
+
+    assert all(saved)
+    assert "Failed to cache extracted entities" not in caplog.text
+    assert all("entity_cache_row" not in record for record in saved)
+
+    texts = [pipeline.extract_text_from_pdf(job["attachment_filepath"], max_pages=8)
+             for job in resume_jobs]
+    db = SessionLocal()
+    try:
+        cached = {row.text_hash for row in db.query(EntityCache)}
+    finally:
+        db.close()
+    assert cached == {entity_cache_key(t) for t in texts}
+
+
+def test_extraction_only_reads_entity_cache(resume_jobs):
+    profile = pipeline.extract_candidate_profile(**resume_jobs[0])
+
+    key, _ = profile["entity_cache_row"]
+    db = SessionLocal()
+    try:
+        assert db.get(EntityCache, key) is None
+    finally:
+        db.close()
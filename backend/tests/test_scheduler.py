@@ -0,0 +1,29 @@
+import asyncio
+
+import main
+
+
+def test_retiming_the_scheduler_lets_a_running_scrape_finish(monkeypatch):
+    started, release, finished = asyncio.Event(), asyncio.Event(), []
+
+    async def fake_scrape():
+        started.set()
+        await release.wait()
+        finished.append(True)
+
+    monkeypatch.setattr(main, "run_scheduled_scrape", fake_scrape)
+
+    async def scenario():
+        main._start_scheduler(0.001)  # minutes
+        await asyncio.wait_for(started.wait(), 5)
+        main._start_scheduler(60)     # config saved mid-run
+        release.set()
+        for _ in range(100):
+            if finished:
+                break
+            await asyncio.sleep(0.01)
+        assert main._next_run_at is not None
+        main._stop_scheduler()
+
+    asyncio.run(scenario())
+    assert finished == [True]
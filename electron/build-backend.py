@@ -1,3 +1,5 @@
+import hashlib
+import runpy
 import subprocess
 import sys
 import os
@@ -13,20 +15,16 @@ BACKEND = ROOT / "backend"
 DIST = ROOT / "electron" / "backend-dist"
 WORK = ROOT / "electron" / "build-temp"
 
-# Clean previous builds
-if DIST.exists():
-    shutil.rmtree(DIST)
-if WORK.exists():
-    shutil.rmtree(WORK)
+BUILD_HASH_FILE = DIST / ".build-hash"
+FORCE = "--force" in sys.argv[1:]
 
 print(f"Python version: {sys.version}")
 print(f"Building from: {BACKEND}")
 print(f"Output to: {DIST}")
 
-# Run version check first
-result = subprocess.run([sys.executable, str(BACKEND / "python_version_check.py")])
-if result.returncode != 0:
-    sys.exit(1)
+# Run version check first — in this interpreter (it's the one PyInstaller
+# bundles); the script sys.exit(1)s on an unsupported version
+runpy.run_path(str(BACKEND / "python_version_check.py"), run_name="__main__")
 
 cmd = [
     sys.executable, "-m", "PyInstaller",
@@ -58,35 +56,41 @@ cmd = [
     "--hidden-import=email",
     "--hidden-import=email.header",
     "--hidden-import=email.utils",
+    "--hidden-import=pymupdf",
     "--hidden-import=pdfplumber",
     "--hidden-import=docx",
-    # Scheduler + auth
-    "--hidden-import=apscheduler",
-    "--hidden-import=apscheduler.schedulers.asyncio",
-    "--hidden-import=apscheduler.triggers.interval",
+    # Auth
     "--hidden-import=msal",
     "--hidden-import=requests",
     # Data
-    "--hidden-import=pandas",
     "--hidden-import=openpyxl",
+    "--hidden-import=orjson",
     # pywin32 / Outlook COM (Windows only — added conditionally below)
     # Collect all data files
+    "--collect-all=pymupdf",
     "--collect-all=pdfplumber",
     "--collect-all=docx",
     "--collect-all=uvicorn",
     "--collect-all=fastapi",
     "--collect-all=msal",
-    "--collect-data=apscheduler",
     # Copy package metadata (ensures self-contained runtime)
     "--copy-metadata", "fastapi",
     "--copy-metadata", "uvicorn",
     "--copy-metadata", "sqlalchemy",
+    "--copy-metadata", "pymupdf",
     "--copy-metadata", "pdfplumber",
     "--copy-metadata", "python-docx",
-    "--copy-metadata", "pandas",
-    "--copy-metadata", "apscheduler",
     "--copy-metadata", "msal",
     "--copy-metadata", "requests",
+    "--copy-metadata", "orjson",
+    # Never imported by the backend; optional imports in dependencies would
+    # otherwise drag them (and their data files) into the bundle
+    "--exclude-module=tkinter",
+    "--exclude-module=test",
+    "--exclude-module=pydoc_data",
+    "--exclude-module=lib2to3",
+    "--exclude-module=IPython",
+    "--exclude-module=matplotlib",
     str(BACKEND / "main.py"),
 ]
 
@@ -110,6 +114,35 @@ if IS_WINDOWS:
     for i, arg in enumerate(win32_args):
         cmd.insert(insert_pos + i, arg)
 
+# ── Skip the build when nothing that feeds it has changed ────────────────────
+def build_inputs_hash():
+    h = hashlib.sha256()
+    h.update(sys.version.encode())
+    h.update("\0".join(cmd).encode())
+    files = sorted(
+        p for p in BACKEND.rglob("*")
+        if p.is_file() and "__pycache__" not in p.parts
+        and (p.suffix == ".py" or p.name in ("requirements.txt", ".env.template"))
+    )
+    for f in files:
+        h.update(f.relative_to(BACKEND).as_posix().encode())
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+build_hash = build_inputs_hash()
+binary = DIST / "mailscraper-backend" / ("mailscraper-backend.exe" if sys.platform == "win32" else "mailscraper-backend")
+if (not FORCE and binary.exists() and BUILD_HASH_FILE.exists()
+        and BUILD_HASH_FILE.read_text().strip() == build_hash):
+    print("Backend unchanged since last build, skipping PyInstaller (pass --force to rebuild)")
+    sys.exit(0)
+
+# Clean previous builds
+if DIST.exists():
+    shutil.rmtree(DIST)
+if WORK.exists():
+    shutil.rmtree(WORK)
+
 print("Running PyInstaller...")
 result = subprocess.run(cmd, cwd=str(BACKEND))
 
@@ -118,7 +151,6 @@ if result.returncode != 0:
     sys.exit(1)
 
 # Verify output binary
-binary = DIST / "mailscraper-backend" / ("mailscraper-backend.exe" if sys.platform == "win32" else "mailscraper-backend")
 if not binary.exists():
     print(f"ERROR: Expected binary not found at {binary}")
     sys.exit(1)
@@ -146,6 +178,8 @@ print(f"Total bundle size: {total_size / 1024 / 1024:.1f} MB")
 if total_size < 50 * 1024 * 1024:
     print("WARNING: Bundle seems too small — Python runtime may not be fully included")
 
+BUILD_HASH_FILE.write_text(build_hash)
+
 print(f"\nBuild successful!")
 print(f"Binary: {binary}")
 print(f"Size: {binary.stat().st_size / 1024 / 1024:.1f} MB")
@@ -416,12 +416,12 @@ export default function OutlookScraper() {
     const refreshDbStats = async () => {
       try {
         const [candRes, emailRes] = await Promise.all([
-          fetch(`${API}/api/candidates`).catch(() => null),
+          fetch(`${API}/api/candidates?limit=1`).catch(() => null),
           fetch(`${API}/api/emails?source=cache&top=1`).catch(() => null),
         ]);
         if (candRes && candRes.ok) {
-          const data = await candRes.json();
-          setDbStats((prev) => ({ ...prev, candidates: data.length }));
+          const total = Number(candRes.headers.get("X-Total-Count") || 0);
+          setDbStats((prev) => ({ ...prev, candidates: total }));
         }
         if (emailRes && emailRes.ok) {
           const data = await emailRes.json();